@@ -0,0 +1,105 @@
+from threading import Lock
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from reviews.models import User
+from .caching import LRUCache
+
+# In concrete field order, as Model.from_db() expects the values.
+USER_FIELDS = tuple(
+    field.attname for field in User._meta.concrete_fields
+    if field.attname in {'id', 'username', 'role', 'is_staff', 'is_active'}
+)
+
+verified_tokens = LRUCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL)
+
+
+class UserChangeStore:
+    """When users last changed, kept in process or in a shared Django cache.
+
+    A cached token is used only if its user has not changed since it was
+    cached. An entry lives as long as the longest cached token, so expiry
+    never lets a stale token back in. When the in-process store is full,
+    all cached tokens are dropped instead of evicting a change.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.local = LRUCache(size, settings.AUTH_CACHE_TTL)
+        self.lock = Lock()
+
+    def backend(self):
+        alias = settings.AUTH_USER_CACHE
+        return self.local if alias is None else caches[alias]
+
+    def key(self, user_id):
+        return f'auth:user:{user_id}'
+
+    def touch(self, user_id):
+        backend = self.backend()
+        with self.lock:
+            if backend is self.local and len(self.local) >= self.size:
+                self.local.clear()
+                verified_tokens.clear()
+            backend.set(self.key(user_id), time(), settings.AUTH_CACHE_TTL)
+
+    def changed_since(self, user_id, since):
+        changed = self.backend().get(self.key(user_id))
+        return changed is not None and changed >= since
+
+    def clear(self):
+        self.local.clear()
+
+
+user_changes = UserChangeStore(settings.AUTH_CACHE_SIZE)
+
+
+def forget_user(user_id):
+    user_changes.touch(user_id)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWTAuthentication that remembers verified tokens and their users.
+
+    A hit skips both the signature check and the user SELECT. The user comes
+    back with only USER_FIELDS loaded, which is all the permissions read.
+    Entries live for AUTH_CACHE_TTL seconds at most and are dropped once the
+    user is saved or deleted. Other processes see such changes at once only
+    if AUTH_USER_CACHE names a cache they share, otherwise after the TTL.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        cached = verified_tokens.get(raw_token)
+        if cached is not None:
+            validated_token, values, cached_at = cached
+            if not user_changes.changed_since(values[0], cached_at):
+                user = User.from_db('default', USER_FIELDS, values)
+                return user, validated_token
+        cached_at = time()
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+        ttl = min(settings.AUTH_CACHE_TTL,
+                  validated_token.get('exp', 0) - time())
+        if ttl > 0:
+            values = tuple(getattr(user, field) for field in USER_FIELDS)
+            verified_tokens.set(
+                raw_token, (validated_token, values, cached_at), ttl
+            )
+        return user, validated_token
@@ -0,0 +1,52 @@
+import json
+from collections import defaultdict
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from reviews.models import Comment
+
+EXPORT_BATCH_SIZE = 2000
+REVIEW_FIELDS = ('id', 'title_id', 'text', 'author__username', 'score',
+                 'pub_date', 'comments_count')
+COMMENT_FIELDS = ('id', 'review_id', 'text', 'author__username', 'pub_date')
+
+
+def renamed(row):
+    row['author'] = row.pop('author__username')
+    return row
+
+
+def attach_comments(reviews):
+    comments = defaultdict(list)
+    for comment in Comment.objects.filter(
+        review_id__in=[review['id'] for review in reviews],
+        author__is_deleted=False
+    ).order_by('review_id', 'pk').values(*COMMENT_FIELDS):
+        comments[comment.pop('review_id')].append(renamed(comment))
+    for review in reviews:
+        review['comments'] = comments[review['id']]
+
+
+def review_rows(reviews, with_comments=False):
+    """Yield reviews as plain dicts in id order.
+
+    Reviews are read in keyset batches (`id > last id`), so memory stays
+    bounded, no COUNT runs and no read cursor stays open between batches.
+    """
+    reviews = reviews.order_by('pk').values(*REVIEW_FIELDS)
+    last_id = 0
+    while True:
+        batch = [renamed(review) for review in
+                 reviews.filter(pk__gt=last_id)[:EXPORT_BATCH_SIZE]]
+        if not batch:
+            return
+        if with_comments:
+            attach_comments(batch)
+        yield from batch
+        last_id = batch[-1]['id']
+
+
+def ndjson(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield '\n'
@@ -0,0 +1,65 @@
+from django.db.models import Exists, OuterRef
+from rest_framework.exceptions import ValidationError
+
+from reviews.models import Category, Genre, Title
+from reviews.search import search_titles
+
+GENRE_MATCH_ALL = 'all'
+
+
+def split_values(value):
+    return [item for item in value.split(',') if item]
+
+
+def year_bound(params, name):
+    value = params.get(name)
+    if value is None:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValidationError({name: 'Год должен быть целым числом.'})
+
+
+def filter_titles(queryset, params):
+    """Apply the title list filters from the query string.
+
+    Genre and category filters are IN/EXISTS subqueries, so they never
+    multiply title rows through joins.
+    """
+    name = params.get('name')
+    if name is not None:
+        queryset = queryset.filter(name=name)
+    year = year_bound(params, 'year')
+    if year is not None:
+        queryset = queryset.filter(year=year)
+    year_min = year_bound(params, 'year_min')
+    if year_min is not None:
+        queryset = queryset.filter(year__gte=year_min)
+    year_max = year_bound(params, 'year_max')
+    if year_max is not None:
+        queryset = queryset.filter(year__lte=year_max)
+    genre = params.get('genre')
+    if genre is not None:
+        slugs = split_values(genre)
+        title_genres = Title.genre.through.objects.filter(
+            title_id=OuterRef('pk')
+        )
+        if params.get('genre_match') == GENRE_MATCH_ALL:
+            for slug in slugs:
+                queryset = queryset.filter(Exists(title_genres.filter(
+                    genre__in=Genre.objects.filter(slug=slug)
+                )))
+        else:
+            queryset = queryset.filter(Exists(title_genres.filter(
+                genre__in=Genre.objects.filter(slug__in=slugs)
+            )))
+    category = params.get('category')
+    if category is not None:
+        queryset = queryset.filter(category__in=Category.objects.filter(
+            slug__in=split_values(category)
+        ))
+    search = params.get('search')
+    if search is not None:
+        queryset = search_titles(queryset, search)
+    return queryset
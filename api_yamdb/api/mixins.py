@@ -0,0 +1,18 @@
+from rest_framework import status
+from rest_framework.response import Response
+
+
+class BulkCreateMixin:
+    """Accept a list payload on create and insert it in bulk."""
+    bulk_serializer_class = None
+
+    def create(self, request, *args, **kwargs):
+        if not isinstance(request.data, list):
+            return super().create(request, *args, **kwargs)
+        serializer = self.bulk_serializer_class(
+            data=request.data, many=True,
+            context=self.get_serializer_context()
+        )
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -0,0 +1,45 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination, PageNumberPagination
+
+RANKED_CURSOR_ERROR = (
+    'Результаты поиска упорядочены по релевантности, курсорная пагинация '
+    'для них недоступна.'
+)
+
+
+class PageNumberOrCursorPagination(PageNumberPagination):
+    """Page numbers by default, a cursor over `view.cursor_ordering` on
+    request. Views with `ranked_search` refuse the cursor for ?search=,
+    since their results are ordered by rank rather than by that ordering.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    search_param = 'search'
+
+    def use_cursor(self, request, view):
+        ordering = getattr(view, 'cursor_ordering', None)
+        if not ordering:
+            return False
+        requested = (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or CursorPagination.cursor_query_param in request.query_params
+        )
+        if (requested and getattr(view, 'ranked_search', False)
+                and self.search_param in request.query_params):
+            raise ValidationError({self.mode_query_param: RANKED_CURSOR_ERROR})
+        return requested
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if not self.use_cursor(request, view):
+            return super().paginate_queryset(queryset, request, view)
+        self.cursor_paginator = CursorPagination()
+        self.cursor_paginator.ordering = view.cursor_ordering
+        return self.cursor_paginator.paginate_queryset(
+            queryset, request, view
+        )
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
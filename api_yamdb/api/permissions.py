@@ -14,6 +14,13 @@ class IsAdmin(permissions.BasePermission):
         return request.user.is_authenticated and request.user.is_admin
 
 
+class IsAdminOrModerator(permissions.BasePermission):
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and (
+            request.user.is_admin or request.user.is_moderator
+        )
+
+
 class IsAdminModeratorOwnerOrReadOnly(permissions.BasePermission):
     def has_permission(self, request, view):
         return (
@@ -25,6 +32,5 @@ class IsAdminModeratorOwnerOrReadOnly(permissions.BasePermission):
         return (
             request.method in permissions.SAFE_METHODS
             or request.user.is_admin or request.user.is_moderator
-            or request.method in permissions.SAFE_METHODS
-            or obj.author == request.user
+            or obj.author_id == request.user.id
         )
@@ -1,28 +1,38 @@
+from operator import attrgetter
+
 from django.conf import settings
+from django.db import transaction
+from django.db.models import Manager, Q
 from rest_framework import serializers
 
-from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.bulk import bulk_create_with_ids
+from reviews.comments import latest_comments
+from reviews.models import (Category, Comment, Genre, OutboxMessage, Review,
+                            ScoreHistogram, Title, User)
+from reviews.outbox import confirmation_mail
+from reviews.versions import bump_versions
 from .validators import username_validator
 
+BULK_BATCH_SIZE = 1000
 
-class ReviewSerializer(serializers.ModelSerializer):
 
-    author = serializers.SlugRelatedField(slug_field="username",
-                                          read_only=True)
+def is_expanded(request, name):
+    if request is None:
+        return False
+    return name in request.query_params.get("expand", "").split(",")
 
-    class Meta:
-        model = Review
-        fields = ("id", "text", "author", "score", "pub_date")
 
-    def validate(self, data):
-        title_id = self.context["request"].parser_context["kwargs"]["title_id"]
-        user = self.context["request"].user
-        if self.context["request"].method == "POST":
-            if user.reviews.filter(title_id=title_id).exists():
-                raise serializers.ValidationError(
-                    "Вы уже оставили отзыв. Нельзя оставлять отзыв дважды."
-                )
-        return data
+def comments_limit(request):
+    value = request.query_params.get("comments_limit")
+    if value is None:
+        return settings.EXPANDED_COMMENTS_LIMIT
+    try:
+        limit = int(value)
+    except ValueError:
+        raise serializers.ValidationError(
+            {"comments_limit": "Ожидается целое число."}
+        )
+    return max(0, min(limit, settings.MAX_EXPANDED_COMMENTS_LIMIT))
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -35,6 +45,31 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ("id", "text", "author", "pub_date")
 
 
+class ReviewSerializer(serializers.ModelSerializer):
+
+    author = serializers.SlugRelatedField(slug_field="username",
+                                          read_only=True)
+    comments = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Review
+        fields = ("id", "text", "author", "score", "pub_date",
+                  "comments_count", "comments")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not is_expanded(self.context.get("request"), "comments"):
+            self.fields.pop("comments")
+
+    def get_comments(self, obj):
+        comments = getattr(obj, "latest_comments", None)
+        if comments is None:
+            comments = latest_comments(
+                [obj.pk], comments_limit(self.context["request"])
+            )
+        return CommentSerializer(comments, many=True).data
+
+
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
         model = Category
@@ -49,15 +84,39 @@ class GenreSerializer(serializers.ModelSerializer):
         lookup_field = "slug"
 
 
+class NameOrderedListSerializer(serializers.ListSerializer):
+    """Sort prefetched objects by name in Python, so the prefetch query
+    does not need an ORDER BY that SQLite would sort in a temp B-tree."""
+
+    def to_representation(self, data):
+        if isinstance(data, Manager):
+            data = data.all()
+        return super().to_representation(
+            sorted(data, key=attrgetter('name'))
+        )
+
+
 class TitleListSerializer(serializers.ModelSerializer):
-    rating = serializers.IntegerField()
+    rating = serializers.IntegerField(read_only=True)
     category = CategorySerializer()
-    genre = GenreSerializer(many=True)
+    genre = NameOrderedListSerializer(child=GenreSerializer())
+    score_histogram = serializers.SerializerMethodField()
 
     class Meta:
         model = Title
-        fields = ("id", "name", "year", "rating",
-                  "description", "genre", "category")
+        fields = ("id", "name", "year", "rating", "reviews_count",
+                  "description", "genre", "category", "score_histogram")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if not is_expanded(self.context.get("request"), "score_histogram"):
+            self.fields.pop("score_histogram")
+
+    def get_score_histogram(self, obj):
+        histogram = getattr(obj, "score_histogram", None)
+        if histogram is None:
+            histogram = ScoreHistogram(title=obj)
+        return histogram.as_dict()
 
 
 class TitleSerializer(serializers.ModelSerializer):
@@ -80,6 +139,180 @@ class TitleSerializer(serializers.ModelSerializer):
         )
 
 
+class BulkListSerializer(serializers.ListSerializer):
+    """Validate a list payload against data preloaded in a few queries
+    and insert it with bulk_create in one transaction."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            self.child.prepare_bulk(
+                [item for item in data if isinstance(item, dict)]
+            )
+        return super().to_internal_value(data)
+
+    def create(self, validated_data):
+        model = self.child.Meta.model
+        with transaction.atomic():
+            objs = model.objects.bulk_create(
+                [model(**item) for item in validated_data]
+            )
+            bump_versions(model)
+        return objs
+
+
+class SlugBulkSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        list_serializer_class = BulkListSerializer
+        extra_kwargs = {'slug': {'validators': []}}
+
+    def prepare_bulk(self, items):
+        self.taken_slugs = set(self.Meta.model.objects.filter(
+            slug__in=[str(item.get('slug')) for item in items]
+        ).values_list('slug', flat=True))
+
+    def validate_slug(self, value):
+        if value in self.taken_slugs:
+            raise serializers.ValidationError(
+                f'Слаг {value} уже используется.'
+            )
+        self.taken_slugs.add(value)
+        return value
+
+
+class CategoryBulkSerializer(SlugBulkSerializer):
+
+    class Meta(SlugBulkSerializer.Meta):
+        model = Category
+        fields = CategorySerializer.Meta.fields
+
+
+class GenreBulkSerializer(SlugBulkSerializer):
+
+    class Meta(SlugBulkSerializer.Meta):
+        model = Genre
+        fields = GenreSerializer.Meta.fields
+
+
+class TitleBulkListSerializer(BulkListSerializer):
+
+    def create(self, validated_data):
+        titles = []
+        title_genres = []
+        for item in validated_data:
+            genres = item.pop('genre')
+            title = Title(**item)
+            title.genre_slugs = [genre.slug for genre in genres]
+            titles.append(title)
+            title_genres.append(genres)
+        with transaction.atomic():
+            bulk_create_with_ids(Title, titles)
+            Title.genre.through.objects.bulk_create([
+                Title.genre.through(title_id=title.pk, genre_id=genre.pk)
+                for title, genres in zip(titles, title_genres)
+                for genre in genres
+            ])
+            bump_versions(Title)
+        return titles
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    category = serializers.SlugField(write_only=True)
+    genre = serializers.ListField(
+        child=serializers.SlugField(), write_only=True
+    )
+
+    class Meta:
+        model = Title
+        fields = TitleSerializer.Meta.fields
+        list_serializer_class = TitleBulkListSerializer
+
+    def prepare_bulk(self, items):
+        genre_slugs = set()
+        for item in items:
+            genres = item.get('genre')
+            if isinstance(genres, list):
+                genre_slugs.update(map(str, genres))
+        self.categories = Category.objects.in_bulk(
+            {str(item.get('category')) for item in items},
+            field_name='slug'
+        )
+        self.genres = Genre.objects.in_bulk(genre_slugs, field_name='slug')
+
+    def validate_category(self, value):
+        if value not in self.categories:
+            raise serializers.ValidationError(
+                f'Категории {value} не существует.'
+            )
+        return self.categories[value]
+
+    def validate_genre(self, value):
+        missing = [slug for slug in value if slug not in self.genres]
+        if missing:
+            raise serializers.ValidationError(
+                f'Жанров {", ".join(missing)} не существует.'
+            )
+        return [self.genres[slug] for slug in dict.fromkeys(value)]
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['genre'] = instance.genre_slugs
+        data['category'] = instance.category.slug
+        return data
+
+
+class ModerationSerializer(serializers.Serializer):
+    reviews = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+    comments = serializers.ListField(
+        child=serializers.IntegerField(), required=False
+    )
+    author = serializers.CharField(required=False)
+    title = serializers.IntegerField(required=False)
+    since = serializers.DateTimeField(required=False)
+    until = serializers.DateTimeField(required=False)
+
+    def validate(self, data):
+        if not data:
+            raise serializers.ValidationError(
+                'Укажите id отзывов, комментариев или фильтр.'
+            )
+        return data
+
+    def filtered(self, queryset, prefix=''):
+        data = self.validated_data
+        lookups = {
+            'author__username': data.get('author'),
+            f'{prefix}title_id': data.get('title'),
+            'pub_date__gte': data.get('since'),
+            'pub_date__lt': data.get('until'),
+        }
+        return queryset.filter(**{
+            lookup: value for lookup, value in lookups.items()
+            if value is not None
+        })
+
+    def querysets(self):
+        """Reviews and comments to delete, None for an untouched model.
+
+        Id lists pick what gets deleted, filters narrow it down. Without
+        id lists the filters select both reviews and comments.
+        """
+        data = self.validated_data
+        by_ids = 'reviews' in data or 'comments' in data
+        reviews = comments = None
+        if 'reviews' in data or not by_ids:
+            reviews = self.filtered(Review.objects.all())
+            if 'reviews' in data:
+                reviews = reviews.filter(pk__in=data['reviews'])
+        if 'comments' in data or not by_ids:
+            comments = self.filtered(Comment.objects.all(), 'review__')
+            if 'comments' in data:
+                comments = comments.filter(pk__in=data['comments'])
+        return reviews, comments
+
+
 class RegistrationSerializer(serializers.Serializer):
     username = serializers.CharField(
         max_length=settings.USERNAME_MAX_LENGTH,
@@ -105,3 +338,60 @@ class UserSerializer(serializers.ModelSerializer):
 
     def validate_username(self, value):
         return username_validator(value)
+
+
+class UserBulkListSerializer(BulkListSerializer):
+
+    def create(self, validated_data):
+        users = [User(**item) for item in validated_data]
+        for user in users:
+            user.set_unusable_password()
+        with transaction.atomic():
+            bulk_create_with_ids(User, users, batch_size=BULK_BATCH_SIZE)
+            OutboxMessage.objects.bulk_create(
+                [confirmation_mail(user) for user in users],
+                batch_size=BULK_BATCH_SIZE
+            )
+        return users
+
+
+class UserBulkSerializer(serializers.ModelSerializer):
+    """Validate users against names and emails fetched once per batch
+    instead of a unique check per field and row."""
+
+    class Meta:
+        model = User
+        fields = UserSerializer.Meta.fields
+        list_serializer_class = UserBulkListSerializer
+        extra_kwargs = {'username': {'validators': []},
+                        'email': {'validators': []}}
+
+    def prepare_bulk(self, items):
+        self.taken_usernames = set()
+        self.taken_emails = set()
+        for start in range(0, len(items), BULK_BATCH_SIZE):
+            batch = items[start:start + BULK_BATCH_SIZE]
+            taken = User.objects.filter(
+                Q(username__in=[str(item.get('username')) for item in batch])
+                | Q(email__in=[str(item.get('email')) for item in batch])
+            ).values_list('username', 'email')
+            for username, email in taken:
+                self.taken_usernames.add(username)
+                self.taken_emails.add(email)
+
+    def validate_username(self, value):
+        username_validator(value)
+        if value in self.taken_usernames:
+            raise serializers.ValidationError(
+                f'Имя пользователя {value} уже занято.'
+            )
+        self.taken_usernames.add(value)
+        return value
+
+    def validate_email(self, value):
+        if value in self.taken_emails:
+            raise serializers.ValidationError(
+                f'Почта {value} уже используется.'
+            )
+        self.taken_emails.add(value)
+        return value
@@ -0,0 +1,112 @@
+from collections.abc import Mapping
+from threading import Lock
+from time import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+from .caching import LRUCache
+
+
+def parse_rate(rate):
+    """'5/min' -> (5, 60)."""
+    count, period = rate.split('/')
+    seconds = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}[period[0]]
+    return int(count), seconds
+
+
+class BucketStore:
+    """Token buckets kept in process, or in a shared Django cache.
+
+    Every check reads and writes a single key. The shared cache has no
+    atomic read-modify-write, so concurrent workers may let a few extra
+    requests through; it only has to stop bursts.
+    """
+
+    def __init__(self, size):
+        self.local = LRUCache(size, ttl=0)
+        self.lock = Lock()
+
+    def backend(self):
+        alias = settings.THROTTLE_CACHE
+        return self.local if alias is None else caches[alias]
+
+    def take(self, key, capacity, period):
+        """Take a token from the bucket `key`.
+
+        Returns 0 when the request may pass, else seconds until it may.
+        """
+        backend = self.backend()
+        now = time()
+        with self.lock:
+            tokens, updated = backend.get(key) or (capacity, now)
+            tokens = min(capacity,
+                         tokens + (now - updated) * capacity / period)
+            wait = 0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) * period / capacity
+            # An untouched bucket is full again after `period`.
+            backend.set(key, (tokens, now), period)
+        return wait
+
+    def clear(self):
+        self.local.clear()
+
+
+buckets = BucketStore(settings.THROTTLE_STORE_SIZE)
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """Throttle by client IP or, with `fields`, by the values of these
+    request fields, using DEFAULT_THROTTLE_RATES[scope]."""
+    scope = None
+    fields = ()
+
+    def get_keys(self, request):
+        if not self.fields:
+            return [f'{self.scope}:ip:{self.get_ident(request)}']
+        if not isinstance(request.data, Mapping):
+            # Not an object: the serializer rejects it with a 400.
+            return []
+        return [
+            f'{self.scope}:{field}:{str(request.data[field]).lower()}'
+            for field in self.fields if request.data.get(field)
+        ]
+
+    def allow_request(self, request, view):
+        self.wait_time = None
+        rate = api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+        if rate is None:
+            return True
+        capacity, period = parse_rate(rate)
+        for key in self.get_keys(request):
+            wait = buckets.take(key, capacity, period)
+            if wait:
+                self.wait_time = wait
+                return False
+        return True
+
+    def wait(self):
+        return self.wait_time
+
+
+class SignupThrottle(TokenBucketThrottle):
+    scope = 'signup'
+
+
+class SignupIdentityThrottle(TokenBucketThrottle):
+    scope = 'signup_identity'
+    fields = ('username', 'email')
+
+
+class TokenThrottle(TokenBucketThrottle):
+    scope = 'token'
+
+
+class TokenIdentityThrottle(TokenBucketThrottle):
+    scope = 'token_identity'
+    fields = ('username',)
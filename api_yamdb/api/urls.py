@@ -2,8 +2,8 @@ from django.urls import include, path
 from rest_framework import routers
 
 from .views import (CategoryViewSet, CommentViewSet, GenreViewSet,
-                    ReviewViewSet, TitleViewSet, UserViewSet, get_jwt_token,
-                    signup)
+                    ReviewViewSet, TitleViewSet, UserViewSet, export_reviews,
+                    get_jwt_token, moderate, signup)
 
 router = routers.DefaultRouter()
 router.register(r"titles/(?P<title_id>\d+)/reviews",
@@ -23,6 +23,8 @@ auth_urls_v1 = [
     path('signup/', signup, name='signup')
 ]
 urlpatterns = [
+    path('v1/moderation/delete/', moderate, name='moderation-delete'),
+    path('v1/reviews/export/', export_reviews, name='reviews-export'),
     path('v1/', include(router.urls)),
     path('v1/auth/', include(auth_urls_v1)),
 ]
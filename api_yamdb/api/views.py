@@ -1,22 +1,46 @@
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db import IntegrityError
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Prefetch
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 
 from rest_framework import filters, mixins, permissions, status, viewsets
-from rest_framework.decorators import action, api_view, permission_classes
+from rest_framework.decorators import (action, api_view, permission_classes,
+                                       throttle_classes)
+from rest_framework.exceptions import ValidationError
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import AccessToken
 
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.aggregates import subtract_author_aggregates
+from reviews.bulk import delete_comments, delete_reviews, raw_delete
+from reviews.comments import attach_latest_comments
+from reviews.models import Category, Comment, Genre, Review, Title, User
+from reviews.outbox import confirmation_mail
+from reviews.search import search_reviews
+from reviews.versions import bump_versions
+from .authentication import forget_user
+from .caching import VersionedCacheMixin
+from .export import ndjson, review_rows
+from .filters import filter_titles
+from .mixins import BulkCreateMixin
 from .permissions import (IsAdmin, IsAdminModeratorOwnerOrReadOnly,
-                          IsAdminOrReadOnly)
-from .serializers import (CategorySerializer, CommentSerializer,
-                          GenreSerializer, RegistrationSerializer,
-                          ReviewSerializer, TitleListSerializer,
-                          TitleSerializer, TokenSerializer, UserSerializer)
+                          IsAdminOrModerator, IsAdminOrReadOnly)
+from .serializers import (CategoryBulkSerializer, CategorySerializer,
+                          CommentSerializer, GenreBulkSerializer,
+                          GenreSerializer, ModerationSerializer,
+                          RegistrationSerializer, ReviewSerializer,
+                          TitleBulkSerializer, TitleListSerializer,
+                          TitleSerializer, TokenSerializer,
+                          UserBulkSerializer, UserSerializer, comments_limit,
+                          is_expanded)
+from .throttling import (SignupIdentityThrottle, SignupThrottle,
+                         TokenIdentityThrottle, TokenThrottle)
+
+DUPLICATE_REVIEW_ERROR = (
+    "Вы уже оставили отзыв. Нельзя оставлять отзыв дважды."
+)
 
 
 class ReviewViewSet(viewsets.ModelViewSet):
@@ -24,14 +48,51 @@ class ReviewViewSet(viewsets.ModelViewSet):
     permission_classes = (
         IsAdminModeratorOwnerOrReadOnly,
     )
+    cursor_ordering = ('-pub_date', '-id')
+    ranked_search = True
 
     def perform_create(self, serializer):
-        title = get_object_or_404(Title, id=self.kwargs.get("title_id"))
-        serializer.save(title=title, author=self.request.user)
+        title = get_object_or_404(
+            Title.objects.only('pk'), pk=self.kwargs.get("title_id"),
+            is_deleted=False
+        )
+        try:
+            with transaction.atomic():
+                serializer.save(title=title, author=self.request.user)
+        except IntegrityError:
+            if not Review.objects.filter(
+                title=title, author=self.request.user
+            ).exists():
+                raise
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [DUPLICATE_REVIEW_ERROR]}
+            )
+
+    def perform_destroy(self, instance):
+        # Comments go first in one statement: the cascade would otherwise
+        # decrement comments_count of the doomed review once per comment.
+        with transaction.atomic():
+            raw_delete(Comment, [instance.pk], 'review')
+            instance.delete()
 
     def get_queryset(self):
-        title = get_object_or_404(Title, pk=self.kwargs.get("title_id"))
-        return title.reviews.all()
+        title_id = self.kwargs.get("title_id")
+        if self.action == 'list':
+            get_object_or_404(Title, pk=title_id, is_deleted=False)
+        queryset = Review.objects.filter(
+            title_id=title_id, title__is_deleted=False,
+            author__is_deleted=False
+        ).select_related('author')
+        search = self.request.query_params.get('search')
+        if search is not None:
+            queryset = search_reviews(queryset, search)
+        return queryset
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if page is not None and is_expanded(self.request, 'comments'):
+            attach_latest_comments(page, comments_limit(self.request))
+        return page
 
 
 class CommentViewSet(viewsets.ModelViewSet):
@@ -39,101 +100,172 @@ class CommentViewSet(viewsets.ModelViewSet):
     permission_classes = (
         IsAdminModeratorOwnerOrReadOnly,
     )
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_review(self):
+        return get_object_or_404(
+            Review.objects.only('id'), pk=self.kwargs.get("review_id"),
+            title_id=self.kwargs.get('title_id'), title__is_deleted=False,
+            author__is_deleted=False
+        )
 
     def perform_create(self, serializer):
-        review = get_object_or_404(Review, pk=self.kwargs.get("review_id"),
-                                   title__id=self.kwargs.get('title_id'))
-        serializer.save(review=review, author=self.request.user)
+        serializer.save(review=self.get_review(), author=self.request.user)
 
     def get_queryset(self):
-        review = get_object_or_404(Review, id=self.kwargs.get("review_id"),
-                                   title__id=self.kwargs.get('title_id'))
-        return review.comments.all()
+        if self.action == 'list':
+            self.get_review()
+        return Comment.objects.filter(
+            review_id=self.kwargs.get("review_id"),
+            review__title_id=self.kwargs.get('title_id'),
+            review__title__is_deleted=False,
+            review__author__is_deleted=False,
+            author__is_deleted=False
+        ).select_related('author')
 
 
-class CategoryViewSet(mixins.ListModelMixin,
+class CategoryViewSet(VersionedCacheMixin,
+                      BulkCreateMixin,
+                      mixins.ListModelMixin,
                       mixins.CreateModelMixin,
                       mixins.DestroyModelMixin,
                       viewsets.GenericViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    cursor_ordering = ('name', 'id')
+    cache_models = (Category,)
     lookup_field = "slug"
     lookup_value_regex = "[^/]+"
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
 
 
-class GenreViewSet(mixins.ListModelMixin,
+class GenreViewSet(VersionedCacheMixin,
+                   BulkCreateMixin,
+                   mixins.ListModelMixin,
                    mixins.CreateModelMixin,
                    mixins.DestroyModelMixin,
                    viewsets.GenericViewSet):
     queryset = Genre.objects.all()
     permission_classes = (IsAdminOrReadOnly,)
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
+    cursor_ordering = ('name', 'id')
+    cache_models = (Genre,)
     lookup_field = "slug"
     lookup_value_regex = "[^/]+"
     filter_backends = (filters.SearchFilter,)
     search_fields = ("name",)
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.annotate(rating=Avg('reviews__score'))
+class TitleViewSet(VersionedCacheMixin, BulkCreateMixin,
+                   viewsets.ModelViewSet):
+    queryset = Title.objects.filter(is_deleted=False)
     serializer_class = TitleSerializer
+    bulk_serializer_class = TitleBulkSerializer
     permission_classes = (IsAdminOrReadOnly,)
+    ranked_search = True
+    cache_models = (Title, Genre, Category, Review)
+
+    @property
+    def cursor_ordering(self):
+        if self.action == 'trending':
+            return ('-trending_score', '-id')
+        return ('name', 'id')
 
     def get_serializer_class(self):
-        if self.action in ['retrieve', 'list']:
+        if self.action in ['retrieve', 'list', 'trending']:
             return TitleListSerializer
         return TitleSerializer
 
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_read(
+            super().retrieve, request, *args, exists=self.object_exists,
+            **kwargs
+        )
+
     def get_queryset(self):
-        queryset = Title.objects.annotate(rating=Avg('reviews__score'))
-        name = self.request.query_params.get('name')
-        if name is not None:
-            queryset = queryset.filter(name=name)
-        year = self.request.query_params.get('year')
-        if year is not None:
-            queryset = queryset.filter(year=year)
-        genre = self.request.query_params.get('genre')
-        if genre is not None:
-            queryset = queryset.filter(genre__slug=genre)
-        category = self.request.query_params.get('category')
-        if category is not None:
-            queryset = queryset.filter(category__slug=category)
-        return queryset
+        queryset = Title.objects.filter(
+            is_deleted=False
+        ).select_related('category').prefetch_related(
+            Prefetch('genre', queryset=Genre.objects.order_by())
+        )
+        if is_expanded(self.request, 'score_histogram'):
+            queryset = queryset.select_related('score_histogram')
+        return filter_titles(queryset, self.request.query_params)
+
+    def perform_destroy(self, instance):
+        Title.objects.filter(pk=instance.pk).update(is_deleted=True)
+        bump_versions(Title)
+
+    @action(detail=False, url_path='trending', url_name='trending')
+    def trending(self, request):
+        return self.cached_read(self.list_trending, request)
+
+    def list_trending(self, request):
+        queryset = self.get_queryset().exclude(
+            trending_score=None
+        ).order_by('-trending_score', '-pk')
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, url_path='facets', url_name='facets')
+    def facets(self, request):
+        return self.cached_read(self.facet_counts, request)
+
+    def facet_counts(self, request):
+        titles = Title.objects.filter(pk__in=filter_titles(
+            Title.objects.filter(is_deleted=False), request.query_params
+        ).order_by().values('pk'))
+        genres = Genre.objects.filter(titles__in=titles).values(
+            'slug', 'name'
+        ).annotate(count=Count('titles')).order_by('name')
+        categories = Category.objects.filter(titles__in=titles).values(
+            'slug', 'name'
+        ).annotate(count=Count('titles')).order_by('name')
+        years = titles.values('year').annotate(
+            count=Count('pk')
+        ).order_by('year')
+        return Response({
+            'count': titles.count(),
+            'genre': list(genres),
+            'category': list(categories),
+            'year': list(years),
+        })
 
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([SignupThrottle, SignupIdentityThrottle])
 def signup(request):
     serializer = RegistrationSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     try:
         user, _ = User.objects.get_or_create(**serializer.validated_data)
     except IntegrityError:
+        user = None
+    if user is None or user.is_deleted:
         return Response(
             {'username': 'Пользователь с таким именем или почтой уже есть.'},
             status=status.HTTP_400_BAD_REQUEST
         )
-    confirmation_code = default_token_generator.make_token(user)
-    send_mail(
-        subject='Регистрация на YamDB',
-        message=f"Ваш код подтверждения: {confirmation_code}",
-        from_email=None,
-        recipient_list=[user.email],
-    )
+    confirmation_mail(user).save()
 
     return Response(serializer.data, status=status.HTTP_200_OK)
 
 
 @api_view(["POST"])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([TokenThrottle, TokenIdentityThrottle])
 def get_jwt_token(request):
     serializer = TokenSerializer(data=request.data)
     serializer.is_valid(raise_exception=True)
     user = get_object_or_404(User,
-                             username=serializer.validated_data["username"])
+                             username=serializer.validated_data["username"],
+                             is_deleted=False)
 
     if default_token_generator.check_token(
         user, serializer.validated_data["confirmation_code"]
@@ -144,32 +276,79 @@ def get_jwt_token(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-class UserViewSet(viewsets.ModelViewSet):
-    queryset = User.objects.all()
+@api_view(["GET"])
+@permission_classes([IsAdmin])
+def export_reviews(request):
+    reviews = Review.objects.filter(
+        title__is_deleted=False, author__is_deleted=False
+    )
+    title = request.query_params.get('title')
+    if title is not None:
+        if not title.isdigit():
+            raise ValidationError({'title': 'Ожидается id произведения.'})
+        reviews = reviews.filter(title_id=title)
+    with_comments = is_expanded(request, 'comments')
+    return StreamingHttpResponse(
+        ndjson(review_rows(reviews, with_comments)),
+        content_type='application/x-ndjson'
+    )
+
+
+@api_view(["POST"])
+@permission_classes([IsAdminOrModerator])
+def moderate(request):
+    serializer = ModerationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    reviews, comments = serializer.querysets()
+    deleted = {'reviews': 0, 'comments': 0}
+    if comments is not None:
+        deleted['comments'] = delete_comments(comments)
+    if reviews is not None:
+        deleted['reviews'], cascaded = delete_reviews(reviews)
+        deleted['comments'] += cascaded
+    if deleted['reviews']:
+        bump_versions(Review)
+    return Response(deleted)
+
+
+class UserViewSet(BulkCreateMixin, viewsets.ModelViewSet):
+    queryset = User.objects.filter(is_deleted=False)
     serializer_class = UserSerializer
+    bulk_serializer_class = UserBulkSerializer
     permission_classes = (IsAdmin,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('username',)
     lookup_field = 'username'
+    cursor_ordering = ('username',)
 
     def update(self, request, *args, **kwargs):
         if request.method == 'PUT':
             return Response(status=status.HTTP_405_METHOD_NOT_ALLOWED)
         return super().update(request, *args, **kwargs)
 
+    def perform_destroy(self, instance):
+        with transaction.atomic():
+            User.objects.filter(pk=instance.pk).update(
+                is_deleted=True, is_active=False
+            )
+            subtract_author_aggregates(instance.pk)
+            bump_versions(Title, Review)
+        forget_user(instance.pk)
+
     @action(
         detail=False, methods=['get', 'patch'],
         url_name='me', url_path='me',
         permission_classes=(IsAuthenticated,)
     )
     def user_information(self, request):
+        user = get_object_or_404(User, pk=request.user.pk)
         if request.method == 'GET':
             return Response(
-                UserSerializer(request.user).data,
+                UserSerializer(user).data,
                 status=status.HTTP_200_OK
             )
         serializer = UserSerializer(
-            request.user, data=request.data, partial=True
+            user, data=request.data, partial=True
         )
         serializer.is_valid(raise_exception=True)
         serializer.save(role=request.user.role)
@@ -71,6 +71,21 @@ DATABASES = {
 }
 
 
+# Cache
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yamdb',
+    }
+}
+
+RESPONSE_CACHE_TIMEOUT = 300
+TRENDING_HALF_LIFE_HOURS = 24
+EXPANDED_COMMENTS_LIMIT = 3
+MAX_EXPANDED_COMMENTS_LIMIT = 20
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -111,23 +126,41 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 AUTH_USER_MODEL = 'reviews.User'
 
 REST_FRAMEWORK = {
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'api.pagination.PageNumberOrCursorPagination',
     'PAGE_SIZE': 10,
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
+    'DEFAULT_THROTTLE_RATES': {
+        'signup': '20/min',
+        'signup_identity': '3/min',
+        'token': '20/min',
+        'token_identity': '5/min',
+    },
 }
+# Alias of a cache shared by all workers for throttle state, e.g. a
+# FileBasedCache; None keeps it in each process.
+THROTTLE_CACHE = None
+THROTTLE_STORE_SIZE = 10000
 SIMPLE_JWT = {
     'ACCESS_TOKEN_LIFETIME': timedelta(days=1),
     'AUTH_HEADER_TYPES': ('Bearer',),
 }
+AUTH_CACHE_SIZE = 4096
+# Alias of a cache shared by all workers that records user changes, so a
+# role change or a deactivation drops cached tokens everywhere at once.
+# With None other workers notice only after AUTH_CACHE_TTL, so keep it short.
+AUTH_USER_CACHE = None
+AUTH_CACHE_TTL = 5
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
 
 DEFAULT_AUTO_FIELD = 'django.db.models.AutoField'
 TEXT_PARAM = 20
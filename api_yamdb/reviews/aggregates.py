@@ -0,0 +1,154 @@
+from collections import defaultdict
+from itertools import groupby
+
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from .models import SCORES, Comment, Review, ScoreHistogram, Title
+
+BATCH_SIZE = 1000
+
+
+def count_scores(title_id, deltas):
+    changes = {
+        ScoreHistogram.field_name(score): (
+            F(ScoreHistogram.field_name(score)) + delta
+        )
+        for score, delta in deltas.items() if score in SCORES
+    }
+    if not changes:
+        return
+    histograms = ScoreHistogram.objects.filter(title_id=title_id)
+    if histograms.update(**changes) or min(deltas.values()) < 0:
+        return
+    ScoreHistogram.objects.bulk_create(
+        [ScoreHistogram(title_id=title_id)], ignore_conflicts=True
+    )
+    histograms.update(**changes)
+
+
+def subtract_reviews(counts):
+    """Take reviews out of the stored aggregates of their titles.
+
+    `counts` holds (title_id, score, number of reviews) rows of the reviews
+    about to be deleted or hidden. Every title gets one UPDATE of deltas,
+    so the cost does not depend on how many other reviews it has.
+    """
+    titles = defaultdict(dict)
+    for title_id, score, total in counts:
+        titles[title_id][score] = titles[title_id].get(score, 0) + total
+    for title_id, scores in titles.items():
+        Title.objects.filter(pk=title_id).update(
+            score_sum=F('score_sum') - sum(
+                score * total for score, total in scores.items()
+            ),
+            reviews_count=F('reviews_count') - sum(scores.values()),
+        )
+        count_scores(
+            title_id, {score: -total for score, total in scores.items()}
+        )
+
+
+def subtract_comments(counts):
+    """Take comments out of comments_count of their reviews, given
+    (review_id, number of comments) rows."""
+    for review_id, total in counts:
+        Review.objects.filter(pk=review_id).update(
+            comments_count=F('comments_count') - total
+        )
+
+
+def title_reviews(**filters):
+    return (Review.objects.filter(title=OuterRef('pk'),
+                                  author__is_deleted=False, **filters)
+            .order_by().values('title'))
+
+
+def refresh_title_aggregates(title_ids=None):
+    titles = Title.objects.all()
+    histograms = ScoreHistogram.objects.all()
+    reviews = Review.objects.filter(
+        score__in=SCORES, author__is_deleted=False
+    )
+    if title_ids is not None:
+        titles = titles.filter(pk__in=title_ids)
+        histograms = histograms.filter(title_id__in=title_ids)
+        reviews = reviews.filter(title_id__in=title_ids)
+    grouped = title_reviews()
+    updated = titles.update(
+        score_sum=Coalesce(Subquery(
+            grouped.annotate(total=Sum('score')).values('total')
+        ), 0),
+        reviews_count=Coalesce(Subquery(
+            grouped.annotate(total=Count('pk')).values('total')
+        ), 0),
+    )
+    histograms.delete()
+    counts = reviews.order_by('title_id', 'score').values_list(
+        'title_id', 'score'
+    ).annotate(total=Count('pk')).iterator(chunk_size=BATCH_SIZE)
+    batch = []
+    for title_id, scores in groupby(counts, key=lambda row: row[0]):
+        batch.append(ScoreHistogram(title_id=title_id, **{
+            ScoreHistogram.field_name(score): total
+            for _, score, total in scores
+        }))
+        if len(batch) == BATCH_SIZE:
+            ScoreHistogram.objects.bulk_create(batch)
+            batch = []
+    ScoreHistogram.objects.bulk_create(batch)
+    return updated
+
+
+def refresh_review_aggregates(review_ids=None):
+    reviews = Review.objects.all()
+    if review_ids is not None:
+        reviews = reviews.filter(pk__in=review_ids)
+    comments = Comment.objects.filter(
+        review=OuterRef('pk'), author__is_deleted=False
+    ).order_by().values('review').annotate(total=Count('pk')).values('total')
+    return reviews.update(comments_count=Coalesce(Subquery(comments), 0))
+
+
+def subtract_author_aggregates(user_id):
+    """Take a user's reviews and comments out of the stored aggregates, e.g.
+    when the user is hidden and their content stops counting."""
+    subtract_reviews(
+        Review.objects.filter(author_id=user_id).order_by()
+        .values_list('title_id', 'score').annotate(total=Count('pk'))
+    )
+    subtract_comments(
+        Comment.objects.filter(author_id=user_id).order_by()
+        .values_list('review_id').annotate(total=Count('pk'))
+    )
+
+
+def stale_review_aggregates():
+    return Review.objects.annotate(
+        actual_comments_count=Count(
+            'comments', filter=Q(comments__author__is_deleted=False)
+        )
+    ).exclude(comments_count=F('actual_comments_count'))
+
+
+def stale_title_aggregates():
+    visible = Q(reviews__author__is_deleted=False)
+    actual = {
+        'actual_score_sum': Coalesce(Sum('reviews__score', filter=visible), 0),
+        'actual_reviews_count': Count('reviews', filter=visible),
+    }
+    compared = [('score_sum', 'actual_score_sum'),
+                ('reviews_count', 'actual_reviews_count')]
+    for score in SCORES:
+        field = ScoreHistogram.field_name(score)
+        actual[f'actual_{field}'] = Count(
+            'reviews', filter=Q(reviews__score=score) & visible
+        )
+        actual[f'stored_{field}'] = Coalesce(
+            F(f'score_histogram__{field}'), 0
+        )
+        compared.append((f'stored_{field}', f'actual_{field}'))
+    mismatch = Q()
+    for stored, real in compared:
+        mismatch |= ~Q(**{stored: F(real)})
+    return Title.objects.annotate(**actual).filter(mismatch)
@@ -1,5 +1,20 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+from .search import install_search_index
+from .trending import register_sql_function
+
+
+def reinstall_search_index(sender, using, **kwargs):
+    install_search_index(connections[using])
 
 
 class ReviewsConfig(AppConfig):
     name = 'reviews'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        post_migrate.connect(reinstall_search_index, sender=self)
+        connection_created.connect(register_sql_function)
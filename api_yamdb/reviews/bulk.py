@@ -0,0 +1,127 @@
+import time
+from collections import Counter
+
+from django.db import connections, transaction
+from django.db.models import Max
+
+from .aggregates import BATCH_SIZE, subtract_comments, subtract_reviews
+from .models import Comment, Review
+
+
+def lock_for_write(model, using='default'):
+    """Take SQLite's write lock before ids are read.
+
+    A deferred transaction only locks on its first write, so another
+    connection could insert between reading MAX(id) and the bulk insert.
+    A no-op UPDATE is a write and makes every other writer wait for us.
+    """
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            'UPDATE sqlite_sequence SET seq = seq WHERE name = %s',
+            [model._meta.db_table]
+        )
+
+
+def last_pk(model, using='default'):
+    last = model.objects.using(using).aggregate(last=Max('pk'))['last'] or 0
+    connection = connections[using]
+    if connection.vendor == 'sqlite':
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT seq FROM sqlite_sequence WHERE name = %s',
+                [model._meta.db_table]
+            )
+            row = cursor.fetchone()
+        if row:
+            last = max(last, row[0])
+    return last
+
+
+def bulk_create_with_ids(model, objs, batch_size=None, using='default'):
+    """bulk_create() that always leaves primary keys set on `objs`.
+
+    Django does not return ids from bulk inserts on SQLite, so they are
+    allocated above the last used id while holding the write lock. Call it
+    first thing in its transaction: a transaction that has already read
+    cannot always wait for the lock and fails with "database is locked".
+    """
+    connection = connections[using]
+    with transaction.atomic(using=using, savepoint=False):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            if connection.vendor == 'sqlite':
+                lock_for_write(model, using)
+            start = last_pk(model, using) + 1
+            for pk, obj in enumerate(objs, start):
+                obj.pk = pk
+        return model.objects.using(using).bulk_create(
+            objs, batch_size=batch_size
+        )
+
+
+def raw_delete(model, values, field='id', using='default'):
+    """DELETE the rows of `model` whose `field` is in `values` in one
+    statement.
+
+    No instances are loaded and no signals or cascades run, so the caller
+    is responsible for dependent rows and denormalized counters.
+    """
+    if not values:
+        return 0
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.get_field(field).column)
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE {column} IN ({placeholders})',
+            list(values)
+        )
+        return cursor.rowcount
+
+
+def delete_comments(comments, batch_size=BATCH_SIZE, pause=0):
+    deleted = 0
+    comments = comments.order_by('pk')
+    while True:
+        with transaction.atomic():
+            batch = list(comments.values_list(
+                'pk', 'review_id', 'author__is_deleted'
+            )[:batch_size])
+            if not batch:
+                return deleted
+            # Comments of hidden authors no longer count anywhere.
+            subtract_comments(Counter(
+                review_id for _, review_id, hidden in batch if not hidden
+            ).items())
+            deleted += raw_delete(Comment, [pk for pk, _, _ in batch])
+        time.sleep(pause)
+
+
+def delete_reviews(reviews, batch_size=BATCH_SIZE, pause=0):
+    """Delete reviews and their comments batch by batch.
+
+    Every batch is its own transaction and subtracts its reviews from the
+    title ratings, so they stay consistent;
+    `pause` seconds between batches let other writers take the lock.
+    Returns the numbers of deleted reviews and comments.
+    """
+    deleted_reviews = deleted_comments = 0
+    reviews = reviews.order_by('pk')
+    while True:
+        with transaction.atomic():
+            batch = list(reviews.values_list(
+                'pk', 'title_id', 'score', 'author__is_deleted'
+            )[:batch_size])
+            if not batch:
+                return deleted_reviews, deleted_comments
+            subtract_reviews(
+                (title_id, score, total) for (title_id, score), total
+                in Counter(
+                    (title_id, score)
+                    for _, title_id, score, hidden in batch if not hidden
+                ).items()
+            )
+            review_ids = [pk for pk, _, _, _ in batch]
+            deleted_comments += raw_delete(Comment, review_ids, 'review')
+            deleted_reviews += raw_delete(Review, review_ids)
+        time.sleep(pause)
@@ -0,0 +1,37 @@
+from collections import defaultdict
+
+from django.db.models.expressions import RawSQL
+
+from .models import Comment
+
+# Row number counted from the newest comment of each review. The window is
+# ordered like the (review_id, pub_date) index, so SQLite does not sort.
+LATEST_COMMENTS_SQL = (
+    'SELECT id FROM ('
+    'SELECT c.id, COUNT(*) OVER ('
+    'PARTITION BY c.review_id ORDER BY c.pub_date, c.id '
+    'ROWS BETWEEN CURRENT ROW AND UNBOUNDED FOLLOWING'
+    ') AS position '
+    'FROM reviews_comment c JOIN reviews_user u ON u.id = c.author_id '
+    'WHERE c.review_id IN ({}) AND NOT u.is_deleted'
+    ') WHERE position <= %s'
+)
+
+
+def latest_comments(review_ids, limit):
+    """The `limit` newest comments of every review, in one query."""
+    review_ids = list(review_ids)
+    if not review_ids or limit < 1:
+        return Comment.objects.none()
+    sql = LATEST_COMMENTS_SQL.format(', '.join(['%s'] * len(review_ids)))
+    return Comment.objects.filter(
+        review_id__in=review_ids, pk__in=RawSQL(sql, (*review_ids, limit))
+    ).select_related('author').order_by('-review_id', '-pub_date', '-id')
+
+
+def attach_latest_comments(reviews, limit):
+    comments = defaultdict(list)
+    for comment in latest_comments([review.pk for review in reviews], limit):
+        comments[comment.review_id].append(comment)
+    for review in reviews:
+        review.latest_comments = comments[review.pk]
@@ -1,7 +1,16 @@
-from csv import DictReader
-
-from django.core.management import BaseCommand
-from reviews.models import Category, Comment, Genre, Review, Title, User
+import os
+from contextlib import contextmanager
+from csv import DictReader, reader
+from itertools import islice
+from time import perf_counter
+
+from django.core.management import BaseCommand, call_command
+from django.db import transaction
+from reviews.aggregates import (refresh_review_aggregates,
+                                refresh_title_aggregates)
+from reviews.models import (Category, Comment, Genre, ImportCheckpoint,
+                            Review, Title, User)
+from reviews.versions import bump_versions
 
 ALREDY_LOADED_ERROR_MESSAGE = """
 Data already loaded. If you need to reload the data from the CSV file,
@@ -17,128 +26,226 @@ REVIEW_CSV = './static/data/review.csv'
 COMMENT_CSV = './static/data/comments.csv'
 GENRE_TITLE_CSV = './static/data/genre_title.csv'
 
+TitleGenre = Title.genre.through
 
-class Command(BaseCommand):
 
-    def handle(self, *args, **options):
-        self.download_category_csv()
-        self.download_genre_csv()
-        self.download_user_csv()
-        self.download_title_csv()
-        self.download_review_csv()
-        self.download_comment_csv()
-        self.download_genre_title_csv()
-
-    def download_category_csv(self):
-        if Category.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
-            return
+def category(row):
+    return Category(id=row['id'], name=row['name'], slug=row['slug'])
 
-        print("Loading category data")
-        with open(CATEGORY_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                category = Category(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-                category.save()
 
-    def download_genre_csv(self):
-        if Genre.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
-            return
+def genre(row):
+    return Genre(id=row['id'], name=row['name'], slug=row['slug'])
 
-        print("Loading genre data")
-        with open(GENRE_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                genre = Genre(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug']
-                )
-                genre.save()
 
-    def download_user_csv(self):
-        if User.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
-            return
+def user(row):
+    return User(
+        id=row['id'],
+        username=row['username'],
+        email=row['email'],
+        role=row['role'],
+        bio=row['bio'],
+        first_name=row['first_name'],
+        last_name=row['last_name']
+    )
 
-        print("Loading user data")
-        with open(USER_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                user = User(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name']
-                )
-                user.save()
 
-    def download_title_csv(self):
-        if Title.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
-            return
+def title(row):
+    return Title(
+        id=row['id'],
+        name=row['name'],
+        year=row['year'],
+        category_id=row['category']
+    )
 
-        print("Loading title data")
-        with open(TITLE_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                title = Title(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category_id=row['category']
-                )
-                title.save()
 
-    def download_review_csv(self):
-        if Review.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
-            return
+def review(row):
+    return Review(
+        id=row['id'],
+        title_id=row['title_id'],
+        text=row['text'],
+        author_id=row['author'],
+        score=row['score'],
+        pub_date=row['pub_date']
+    )
 
-        print("Loading review data")
-        with open(REVIEW_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                review = Review(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author_id=row['author'],
-                    score=row['score'],
-                    pub_date=row['pub_date']
-                )
-                review.save()
 
-    def download_comment_csv(self):
-        if Comment.objects.exists():
-            print(ALREDY_LOADED_ERROR_MESSAGE)
+def comment(row):
+    return Comment(
+        id=row['id'],
+        review_id=row['review_id'],
+        text=row['text'],
+        author_id=row['author'],
+        pub_date=row['pub_date']
+    )
+
+
+def title_genre(row):
+    return TitleGenre(
+        id=row['id'], title_id=row['title_id'], genre_id=row['genre_id']
+    )
+
+
+TABLES = (
+    (Category, CATEGORY_CSV, category),
+    (Genre, GENRE_CSV, genre),
+    (User, USER_CSV, user),
+    (Title, TITLE_CSV, title),
+    (Review, REVIEW_CSV, review),
+    (Comment, COMMENT_CSV, comment),
+    (TitleGenre, GENRE_TITLE_CSV, title_genre),
+)
+
+
+def batches(objs, size):
+    objs = iter(objs)
+    while True:
+        batch = list(islice(objs, size))
+        if not batch:
             return
+        yield batch
+
+
+class OffsetLines:
+    """Decoded lines of a binary file, counting the bytes handed out."""
+
+    def __init__(self, csv_file):
+        self.file = csv_file
+        self.offset = csv_file.tell()
+
+    def __iter__(self):
+        for line in self.file:
+            self.offset += len(line)
+            yield line.decode('utf-8')
+
+    def seek(self, offset):
+        self.file.seek(offset)
+        self.offset = offset
+
+
+def read_rows(path, offset=0):
+    """Yield (row, offset) pairs, where offset is the position right after
+    the row, so the file can be reopened there later. csv.reader pulls
+    lines one by one, so quoted multiline values are handled too."""
+    with open(path, mode='rb') as csv_file:
+        lines = OffsetLines(csv_file)
+        rows = reader(lines)
+        header = next(rows)
+        header[0] = header[0].lstrip('\ufeff')
+        if offset > lines.offset:
+            lines.seek(offset)
+        for values in rows:
+            yield dict(zip(header, values)), lines.offset
+
+
+@contextmanager
+def imported_dates(*models):
+    """Keep pub_date from the CSV: auto_now_add would overwrite it."""
+    fields = [model._meta.get_field('pub_date') for model in models]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
 
-        print("Loading comments data")
-        with open(COMMENT_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                comment = Comment(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author_id=row['author'],
-                    pub_date=row['pub_date']
+class Command(BaseCommand):
+    help = 'Load the CSV files from static/data into an empty database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--stream', action='store_true',
+            help='Commit every batch and resume from the last checkpoint'
+        )
+
+    def handle(self, *args, **options):
+        started = perf_counter()
+        loaded = False
+        load = self.stream if options['stream'] else self.load
+        with imported_dates(Review, Comment):
+            for model, path, make in TABLES:
+                loaded |= load(model, path, make, options['batch_size'])
+        if options['stream']:
+            # A run interrupted after its last batch left the aggregates
+            # unrefreshed; its checkpoints say so.
+            loaded |= ImportCheckpoint.objects.filter(
+                refreshed=False
+            ).exists()
+        if not loaded:
+            return
+        self.refresh_denormalized()
+        ImportCheckpoint.objects.update(refreshed=True)
+        self.stdout.write(f'Total: {perf_counter() - started:.2f}s')
+
+    def load(self, model, path, make, batch_size):
+        name = model._meta.db_table
+        if model.objects.exists():
+            self.stdout.write(f'{name}: {ALREDY_LOADED_ERROR_MESSAGE}')
+            return False
+        started = perf_counter()
+        count = 0
+        with open(path, mode='r', encoding='utf-8-sig') as csv_file, \
+                transaction.atomic():
+            rows = DictReader(csv_file)
+            for batch in batches(map(make, rows), batch_size):
+                model.objects.bulk_create(batch)
+                count += len(batch)
+        self.stdout.write(
+            f'{name}: {count} rows in {perf_counter() - started:.2f}s'
+        )
+        return True
+
+    def stream(self, model, path, make, batch_size):
+        name = model._meta.db_table
+        checkpoint = ImportCheckpoint.objects.filter(file=path).first()
+        if checkpoint is None and model.objects.exists():
+            self.stdout.write(f'{name}: {ALREDY_LOADED_ERROR_MESSAGE}')
+            return False
+        offset = checkpoint.offset if checkpoint else 0
+        if offset >= os.path.getsize(path):
+            self.stdout.write(f'{name}: already imported')
+            return False
+        if offset:
+            self.stdout.write(
+                f'{name}: resuming at byte {offset} '
+                f'after id {checkpoint.last_id}'
+            )
+        started = reported = perf_counter()
+        count = 0
+        for batch in batches(read_rows(path, offset), batch_size):
+            row, offset = batch[-1]
+            with transaction.atomic():
+                model.objects.bulk_create(make(row) for row, _ in batch)
+                ImportCheckpoint.objects.update_or_create(
+                    file=path,
+                    defaults={'offset': offset, 'last_id': row['id'],
+                              'refreshed': False}
+                )
+            count += len(batch)
+            if perf_counter() - reported >= 1:
+                reported = perf_counter()
+                self.stdout.write(
+                    f'{name}: {count} rows, '
+                    f'{count / (reported - started):.0f} rows/s'
                 )
-                comment.save()
-
-    def download_genre_title_csv(self):
-        print("Loading title genre data")
-        with open(GENRE_TITLE_CSV, mode='r', encoding='utf-8-sig') as csv_file:
-            csv_reader = DictReader(csv_file)
-            for row in csv_reader:
-                title = Title.objects.get(id=row['title_id'])
-                title.genres.add(row['genre_id'])
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            f'{name}: {count} rows in {elapsed:.2f}s, '
+            f'{count / elapsed if elapsed else count:.0f} rows/s'
+        )
+        return count > 0
+
+    def refresh_denormalized(self):
+        """bulk_create() sends no signals, so ratings, counters, trending
+        scores and cache versions are rebuilt once at the end."""
+        started = perf_counter()
+        with transaction.atomic():
+            refresh_title_aggregates()
+            refresh_review_aggregates()
+            bump_versions(Category, Genre, Title, Review)
+        call_command('rebuild_trending', stdout=self.stdout)
+        self.stdout.write(
+            f'Aggregates refreshed in {perf_counter() - started:.2f}s'
+        )
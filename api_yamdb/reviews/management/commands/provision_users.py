@@ -0,0 +1,32 @@
+import csv
+
+from django.core.management import BaseCommand, CommandError
+
+from api.serializers import BULK_BATCH_SIZE, UserBulkSerializer
+
+
+class Command(BaseCommand):
+    help = ('Create users from a CSV file with username and email columns '
+            'and queue their confirmation mails')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        with open(options['path'], encoding='utf-8', newline='') as file:
+            rows = [{field: value for field, value in row.items() if value}
+                    for row in csv.DictReader(file)]
+        serializer = UserBulkSerializer(data=rows, many=True)
+        if not serializer.is_valid():
+            for line, errors in enumerate(serializer.errors, 2):
+                for field, messages in errors.items():
+                    self.stderr.write(
+                        f'line {line}, {field}: {" ".join(messages)}'
+                    )
+            raise CommandError('No users created, fix the rows above')
+        users = serializer.validated_data
+        batch_size = options['batch_size']
+        for start in range(0, len(users), batch_size):
+            serializer.create(users[start:start + batch_size])
+        self.stdout.write(f'Created {len(users)} users')
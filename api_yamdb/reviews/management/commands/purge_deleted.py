@@ -0,0 +1,66 @@
+import time
+
+from django.core.management import BaseCommand
+from django.db.models import Q
+
+from reviews.aggregates import BATCH_SIZE
+from reviews.bulk import delete_comments, delete_reviews
+from reviews.models import Comment, Review, Title, User
+from reviews.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = ('Delete hidden titles and users together with their reviews '
+            'and comments, batch by batch')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--pause', type=float, default=0.05,
+            help='Seconds to wait between batches'
+        )
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and look for hidden rows every --interval'
+        )
+        parser.add_argument('--interval', type=float, default=60)
+
+    def handle(self, *args, **options):
+        while True:
+            self.purge(options['batch_size'], options['pause'])
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
+
+    def purge(self, batch_size, pause):
+        titles = list(
+            Title.objects.filter(is_deleted=True).values_list('pk', flat=True)
+        )
+        users = list(
+            User.objects.filter(is_deleted=True).values_list('pk', flat=True)
+        )
+        if not titles and not users:
+            return
+        comments = delete_comments(
+            Comment.objects.filter(author_id__in=users), batch_size, pause
+        )
+        reviews, cascaded = delete_reviews(
+            Review.objects.filter(
+                Q(title_id__in=titles) | Q(author_id__in=users)
+            ),
+            batch_size, pause
+        )
+        for start in range(0, len(titles), batch_size):
+            Title.objects.filter(
+                pk__in=titles[start:start + batch_size]
+            ).delete()
+        for start in range(0, len(users), batch_size):
+            User.objects.filter(
+                pk__in=users[start:start + batch_size]
+            ).delete()
+        if reviews:
+            bump_versions(Review)
+        self.stdout.write(
+            f'Purged {len(titles)} titles, {len(users)} users, '
+            f'{reviews} reviews and {comments + cascaded} comments'
+        )
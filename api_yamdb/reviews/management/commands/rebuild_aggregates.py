@@ -0,0 +1,50 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from reviews.aggregates import (refresh_review_aggregates,
+                                refresh_title_aggregates,
+                                stale_review_aggregates,
+                                stale_title_aggregates)
+from reviews.models import Review, Title
+from reviews.versions import bump_versions
+
+
+class Command(BaseCommand):
+    help = ('Rebuild or check the review aggregates stored on titles and '
+            'the comment counts stored on reviews')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Only report titles and reviews with stale aggregates',
+        )
+
+    def handle(self, *args, **options):
+        stale_titles = list(stale_title_aggregates())
+        for title in stale_titles:
+            self.stdout.write(
+                f'Title {title.pk}: stale aggregates, score sum/count '
+                f'stored {title.score_sum}/{title.reviews_count}, actual '
+                f'{title.actual_score_sum}/{title.actual_reviews_count}'
+            )
+        stale_reviews = list(stale_review_aggregates())
+        for review in stale_reviews:
+            self.stdout.write(
+                f'Review {review.pk}: stored {review.comments_count} '
+                f'comments, actual {review.actual_comments_count}'
+            )
+        if options['check']:
+            if stale_titles or stale_reviews:
+                raise CommandError(
+                    f'{len(stale_titles)} titles and {len(stale_reviews)} '
+                    'reviews have stale aggregates'
+                )
+            self.stdout.write('All aggregates are up to date')
+            return
+        with transaction.atomic():
+            titles = refresh_title_aggregates()
+            reviews = refresh_review_aggregates()
+            bump_versions(Title, Review)
+        self.stdout.write(
+            f'Rebuilt aggregates for {titles} titles and {reviews} reviews'
+        )
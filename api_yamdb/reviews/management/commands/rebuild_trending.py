@@ -0,0 +1,31 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+
+from reviews.models import Review, Title
+from reviews.trending import trending_scores
+from reviews.versions import bump_versions
+
+BATCH_SIZE = 1000
+
+
+class Command(BaseCommand):
+    help = 'Recompute trending scores of titles from their reviews'
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.order_by('title_id').values_list(
+            'title_id', 'score', 'pub_date'
+        ).iterator(chunk_size=BATCH_SIZE)
+        updated = 0
+        batch = []
+        with transaction.atomic():
+            Title.objects.update(trending_score=None)
+            for title_id, score in trending_scores(reviews):
+                batch.append(Title(pk=title_id, trending_score=score))
+                if len(batch) == BATCH_SIZE:
+                    Title.objects.bulk_update(batch, ['trending_score'])
+                    updated += len(batch)
+                    batch = []
+            Title.objects.bulk_update(batch, ['trending_score'])
+            updated += len(batch)
+            bump_versions(Title)
+        self.stdout.write(f'Rebuilt trending scores for {updated} titles')
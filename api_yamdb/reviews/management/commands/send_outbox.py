@@ -0,0 +1,30 @@
+import time
+
+from django.core.management import BaseCommand
+
+from reviews.outbox import send_pending_mail
+
+
+class Command(BaseCommand):
+    help = 'Send queued mail from the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument(
+            '--loop', action='store_true',
+            help='Keep running and poll the outbox every --interval'
+        )
+        parser.add_argument('--interval', type=float, default=5)
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            sent, failed = send_pending_mail(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(f'Sent {total_sent} messages, {total_failed} failed')
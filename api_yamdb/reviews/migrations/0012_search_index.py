@@ -0,0 +1,57 @@
+from django.db import migrations
+
+# The indexes as they were when this migration was written. The live
+# definitions in reviews.search are reinstalled after every migrate.
+INDEXES = (
+    ('reviews_title_fts', 'reviews_title', 'name, description'),
+    ('reviews_review_fts', 'reviews_review', 'text'),
+    ('reviews_comment_fts', 'reviews_comment', 'text'),
+)
+
+
+def statements(index, table, names):
+    columns = names.split(', ')
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    insert = f'INSERT INTO {index}(rowid, {names}) VALUES (new.id, {new});'
+    delete = (f'INSERT INTO {index}({index}, rowid, {names}) '
+              f"VALUES ('delete', old.id, {old});")
+    return (
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5('
+        f"{names}, content='{table}', content_rowid='id')",
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {index}_au '
+        f'AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END',
+        f"INSERT INTO {index}({index}) VALUES ('rebuild')",
+    )
+
+
+def install(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for index, table, names in INDEXES:
+        for statement in statements(index, table, names):
+            schema_editor.execute(statement)
+
+
+def uninstall(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for index, _, _ in INDEXES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {index}_{suffix}')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {index}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_aggregates'),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,32 @@
+from django.db import migrations, models
+
+from reviews.trending import trending_scores
+
+
+def fill_trending_scores(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.order_by('title_id').values_list(
+        'title_id', 'score', 'pub_date'
+    )
+    Title.objects.bulk_update(
+        [Title(pk=title_id, trending_score=score)
+         for title_id, score in trending_scores(reviews.iterator())],
+        ['trending_score'], batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_modelversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='trending_score',
+            field=models.FloatField(db_index=True, editable=False, null=True, verbose_name='Популярность'),
+        ),
+        migrations.RunPython(fill_trending_scores, migrations.RunPython.noop),
+    ]
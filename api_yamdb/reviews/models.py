@@ -4,7 +4,11 @@ from api.validators import username_validator
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
+from django.utils import timezone
+
+
+SCORES = range(settings.MIN_VALUE_VALIDATOR, settings.MAX_VALUE_VALIDATOR + 1)
 
 
 def current_year():
@@ -48,6 +52,9 @@ class User(AbstractUser):
         default=ROLE_USER,
         blank=True
     )
+    is_deleted = models.BooleanField(
+        'Удалён', default=False, editable=False, db_index=True
+    )
 
     class Meta:
         verbose_name = 'Пользователь'
@@ -67,6 +74,12 @@ class Category(models.Model):
     name = models.CharField(max_length=256, verbose_name="Название категории")
     slug = models.SlugField(unique=True, max_length=50)
 
+    class Meta:
+        ordering = ['name']
+        indexes = (
+            models.Index(fields=['name'], name='category_name_idx'),
+        )
+
     def __str__(self):
         return self.name
 
@@ -89,6 +102,9 @@ class Genre(models.Model):
         verbose_name = 'Жанр'
         verbose_name_plural = 'Жанры'
         ordering = ['name']
+        indexes = (
+            models.Index(fields=['name'], name='genre_name_idx'),
+        )
 
 
 class Title(models.Model):
@@ -103,15 +119,38 @@ class Title(models.Model):
         Category, on_delete=models.SET_NULL, related_name="titles", null=True
     )
     genre = models.ManyToManyField(Genre, related_name="titles")
+    score_sum = models.PositiveIntegerField(
+        "Сумма оценок", default=0, editable=False
+    )
+    reviews_count = models.PositiveIntegerField(
+        "Количество отзывов", default=0, editable=False
+    )
+    trending_score = models.FloatField(
+        "Популярность", null=True, editable=False, db_index=True
+    )
+    is_deleted = models.BooleanField(
+        "Удалено", default=False, editable=False, db_index=True
+    )
 
     class Meta:
         verbose_name = "Произведение"
         verbose_name_plural = "Произведения"
         ordering = ["name"]
+        indexes = (
+            models.Index(fields=["name"], name="title_name_idx"),
+            models.Index(fields=["trending_score", "is_deleted"],
+                         name="title_trending_idx"),
+        )
 
     def __str__(self):
         return self.name
 
+    @property
+    def rating(self):
+        if not self.reviews_count:
+            return None
+        return self.score_sum / self.reviews_count
+
 
 class Review(models.Model):
 
@@ -122,6 +161,9 @@ class Review(models.Model):
                                related_name="reviews")
     pub_date = models.DateTimeField("Дата публикации", auto_now_add=True,
                                     db_index=True)
+    comments_count = models.PositiveIntegerField(
+        "Количество комментариев", default=0, editable=False
+    )
     score = models.PositiveSmallIntegerField(
         "Оценка",
         default=0,
@@ -137,6 +179,10 @@ class Review(models.Model):
     class Meta:
         verbose_name = "Отзыв"
         ordering = ["-pub_date"]
+        indexes = (
+            models.Index(fields=["title", "pub_date"],
+                         name="review_title_pub_date_idx"),
+        )
         constraints = (
             models.UniqueConstraint(
                 fields=["author", "title"], name="unique_relationships"
@@ -146,11 +192,54 @@ class Review(models.Model):
     def __str__(self):
         return self.text[:settings.TEXT_PARAM]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get("score")
+        return instance
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class ScoreHistogram(models.Model):
+    title = models.OneToOneField(
+        Title, on_delete=models.CASCADE, primary_key=True,
+        related_name="score_histogram"
+    )
+    score_1 = models.PositiveIntegerField("Оценка 1", default=0)
+    score_2 = models.PositiveIntegerField("Оценка 2", default=0)
+    score_3 = models.PositiveIntegerField("Оценка 3", default=0)
+    score_4 = models.PositiveIntegerField("Оценка 4", default=0)
+    score_5 = models.PositiveIntegerField("Оценка 5", default=0)
+    score_6 = models.PositiveIntegerField("Оценка 6", default=0)
+    score_7 = models.PositiveIntegerField("Оценка 7", default=0)
+    score_8 = models.PositiveIntegerField("Оценка 8", default=0)
+    score_9 = models.PositiveIntegerField("Оценка 9", default=0)
+    score_10 = models.PositiveIntegerField("Оценка 10", default=0)
+
+    class Meta:
+        verbose_name = "Распределение оценок"
+        verbose_name_plural = "Распределения оценок"
+
+    def __str__(self):
+        return str(self.title)
+
+    @staticmethod
+    def field_name(score):
+        return f"score_{score}"
+
+    def as_dict(self):
+        return {str(score): getattr(self, self.field_name(score))
+                for score in SCORES}
+
 
 class Comment(models.Model):
 
     review = models.ForeignKey(
-        Review, on_delete=models.CASCADE, related_name="comments"
+        Review, on_delete=models.CASCADE, related_name="comments",
+        db_index=False
     )
     text = models.TextField(verbose_name="Текст")
     author = models.ForeignKey(User, on_delete=models.CASCADE,
@@ -162,6 +251,72 @@ class Comment(models.Model):
     class Meta:
         verbose_name = "Комментарий"
         ordering = ["-pub_date"]
+        indexes = (
+            models.Index(fields=["review", "pub_date"],
+                         name="comment_review_pub_date_idx"),
+        )
 
     def __str__(self):
         return self.text[:settings.TEXT_PARAM]
+
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
+
+class ModelVersion(models.Model):
+    model = models.CharField("Модель", max_length=100, primary_key=True)
+    version = models.PositiveIntegerField("Версия", default=0)
+    modified = models.DateTimeField("Дата изменения", default=timezone.now)
+
+    class Meta:
+        verbose_name = "Версия данных"
+        verbose_name_plural = "Версии данных"
+
+    def __str__(self):
+        return f"{self.model} v{self.version}"
+
+
+class OutboxMessage(models.Model):
+    recipient = models.EmailField(
+        "Получатель", max_length=settings.EMAIL_MAX_LENGTH
+    )
+    subject = models.CharField("Тема", max_length=255)
+    body = models.TextField("Текст")
+    created = models.DateTimeField("Дата создания", auto_now_add=True)
+    attempts = models.PositiveSmallIntegerField("Попытки отправки", default=0)
+    next_attempt = models.DateTimeField(
+        "Следующая попытка", default=timezone.now
+    )
+    sent = models.DateTimeField("Дата отправки", null=True, blank=True)
+    last_error = models.TextField("Последняя ошибка", blank=True)
+
+    class Meta:
+        verbose_name = "Письмо"
+        verbose_name_plural = "Исходящие письма"
+        indexes = (
+            models.Index(fields=["sent", "next_attempt"],
+                         name="outbox_queue_idx"),
+        )
+
+    def __str__(self):
+        return f"{self.recipient}: {self.subject}"
+
+
+class ImportCheckpoint(models.Model):
+    file = models.CharField("Файл", max_length=255, unique=True)
+    offset = models.PositiveBigIntegerField("Смещение в байтах", default=0)
+    last_id = models.PositiveBigIntegerField(
+        "Последний загруженный id", null=True, blank=True
+    )
+    refreshed = models.BooleanField(
+        "Агрегаты пересчитаны", default=False
+    )
+    updated = models.DateTimeField("Дата обновления", auto_now=True)
+
+    class Meta:
+        verbose_name = "Точка восстановления импорта"
+        verbose_name_plural = "Точки восстановления импорта"
+
+    def __str__(self):
+        return f"{self.file}: {self.offset}"
@@ -0,0 +1,72 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+def confirmation_mail(user):
+    """An unsaved outbox message with the confirmation code of `user`."""
+    code = default_token_generator.make_token(user)
+    return OutboxMessage(
+        subject='Регистрация на YamDB',
+        body=f'Ваш код подтверждения: {code}',
+        recipient=user.email,
+    )
+
+
+def pending_mail():
+    return OutboxMessage.objects.filter(
+        sent=None, next_attempt__lte=timezone.now(),
+        attempts__lt=settings.OUTBOX_MAX_ATTEMPTS
+    ).order_by('next_attempt')
+
+
+def retry_delay(attempts):
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** attempts)
+
+
+def send_pending_mail(batch_size):
+    """Send one batch of queued mail over a single backend connection.
+
+    A message that fails is retried later with exponential backoff until it
+    runs out of attempts. Returns the numbers of sent and failed messages.
+    """
+    messages = list(pending_mail()[:batch_size])
+    if not messages:
+        return 0, 0
+    connection = get_connection()
+    sent = []
+    failed = []
+    try:
+        connection.open()
+    except Exception as error:
+        failed = [(message, error) for message in messages]
+    else:
+        try:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        subject=message.subject, body=message.body,
+                        to=[message.recipient], connection=connection
+                    ).send()
+                except Exception as error:
+                    failed.append((message, error))
+                else:
+                    sent.append(message.pk)
+        finally:
+            connection.close()
+    now = timezone.now()
+    OutboxMessage.objects.filter(pk__in=sent).update(sent=now)
+    for message, error in failed:
+        message.attempts += 1
+        message.next_attempt = now + retry_delay(message.attempts)
+        message.last_error = str(error)
+    OutboxMessage.objects.bulk_update(
+        [message for message, _ in failed],
+        ['attempts', 'next_attempt', 'last_error']
+    )
+    return len(sent), len(failed)
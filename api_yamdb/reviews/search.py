@@ -0,0 +1,173 @@
+import re
+
+from django.db.models import F, FloatField, Q
+from django.db.models.expressions import Col, RawSQL
+from django.db.models.sql.constants import INNER, LOUTER
+
+SEARCH_INDEXES = {
+    'reviews_title_fts': ('reviews_title', ('name', 'description')),
+    'reviews_review_fts': ('reviews_review', ('text',)),
+    'reviews_comment_fts': ('reviews_comment', ('text',)),
+}
+TRIGGER_SUFFIXES = ('ai', 'ad', 'au')
+
+
+def index_statements(index, table, columns):
+    names = ', '.join(columns)
+    new_values = ', '.join(f'new.{column}' for column in columns)
+    old_values = ', '.join(f'old.{column}' for column in columns)
+    insert = (f'INSERT INTO {index}(rowid, {names}) '
+              f'VALUES (new.id, {new_values});')
+    delete = (f'INSERT INTO {index}({index}, rowid, {names}) '
+              f"VALUES ('delete', old.id, {old_values});")
+    return (
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {index}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {index}_au '
+        f'AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END',
+    )
+
+
+def install_search_index(connection):
+    """Create the FTS5 tables and the triggers that keep them in sync.
+
+    Django rebuilds SQLite tables on most schema changes, which drops their
+    triggers, so this runs after every migrate and reindexes a table whenever
+    its triggers had to be recreated.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+        triggers = {name for name, in cursor.fetchall()}
+        for index, (table, columns) in SEARCH_INDEXES.items():
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {index} USING fts5('
+                f"{', '.join(columns)}, content='{table}', content_rowid='id')"
+            )
+            if all(f'{index}_{suffix}' in triggers
+                   for suffix in TRIGGER_SUFFIXES):
+                continue
+            for statement in index_statements(index, table, columns):
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {index}({index}) VALUES ('rebuild')")
+
+
+def uninstall_search_index(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for index in SEARCH_INDEXES:
+            for suffix in TRIGGER_SUFFIXES:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {index}_{suffix}')
+            cursor.execute(f'DROP TABLE IF EXISTS {index}')
+
+
+def match_expression(text):
+    return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', text))
+
+
+class MatchJoin:
+    """Join the (rowid, rank) pairs of one full-text query to a model table.
+
+    The MATCH runs once as a derived table, instead of once per candidate
+    row as a correlated subquery would. Follows the interface Query.alias_map
+    expects from django.db.models.sql.datastructures.Join.
+    """
+    filtered_relation = None
+
+    def __init__(self, index, match, parent_alias, join_type,
+                 table_alias=None):
+        self.index = index
+        self.match = match
+        self.table_name = f'{index}_match'
+        self.parent_alias = parent_alias
+        self.table_alias = table_alias
+        self.join_type = join_type
+        self.nullable = join_type == LOUTER
+
+    def as_sql(self, compiler, connection):
+        qn = compiler.quote_name_unless_alias
+        return (
+            f'{self.join_type} (SELECT rowid, rank FROM {self.index} '
+            f'WHERE {self.index} MATCH %s) {self.table_alias} '
+            f'ON ({self.table_alias}.rowid = {qn(self.parent_alias)}.id)',
+            [self.match]
+        )
+
+    def relabeled_clone(self, change_map):
+        return self.__class__(
+            self.index, self.match,
+            change_map.get(self.parent_alias, self.parent_alias),
+            self.join_type,
+            change_map.get(self.table_alias, self.table_alias),
+        )
+
+    @property
+    def identity(self):
+        return (self.__class__, self.index, self.match, self.parent_alias)
+
+    def __eq__(self, other):
+        if not isinstance(other, MatchJoin):
+            return NotImplemented
+        return self.identity == other.identity
+
+    def __hash__(self):
+        return hash(self.identity)
+
+    def equals(self, other, with_filtered_relation):
+        return self == other
+
+    def demote(self):
+        new = self.relabeled_clone({})
+        new.join_type = INNER
+        return new
+
+    def promote(self):
+        new = self.relabeled_clone({})
+        new.join_type = LOUTER
+        new.nullable = True
+        return new
+
+
+def with_search_rank(queryset, index, match, join_type=INNER):
+    """Annotate search_rank from a joined full-text query. An INNER join
+    also limits the queryset to the matching rows."""
+    queryset = queryset.all()
+    query = queryset.query
+    alias = query.join(
+        MatchJoin(index, match, query.get_initial_alias(), join_type)
+    )
+    rank = FloatField()
+    rank.set_attributes_from_name('rank')
+    return queryset.annotate(search_rank=Col(alias, rank))
+
+
+def search_titles(queryset, text):
+    match = match_expression(text)
+    if not match:
+        return queryset.none()
+    return with_search_rank(
+        queryset, 'reviews_title_fts', match
+    ).order_by('search_rank', 'pk')
+
+
+def search_reviews(queryset, text):
+    """Rank reviews by their own text; reviews found only through one of
+    their comments follow the direct matches."""
+    match = match_expression(text)
+    if not match:
+        return queryset.none()
+    commented = RawSQL(
+        'SELECT review_id FROM reviews_comment WHERE id IN '
+        '(SELECT rowid FROM reviews_comment_fts '
+        'WHERE reviews_comment_fts MATCH %s)',
+        (match,)
+    )
+    return with_search_rank(
+        queryset, 'reviews_review_fts', match, LOUTER
+    ).filter(
+        Q(search_rank__isnull=False) | Q(pk__in=commented)
+    ).order_by(F('search_rank').asc(nulls_last=True), '-pub_date')
@@ -0,0 +1,75 @@
+from django.db.models import F, Value
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .aggregates import count_scores, refresh_title_aggregates
+from .models import Category, Comment, Genre, Review, Title
+from .trending import LogAddExp, review_weight
+from .versions import bump_versions
+
+VERSIONED_MODELS = (Category, Genre, Review, Title)
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_score = getattr(instance, '_loaded_score', None)
+    if created:
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score,
+            reviews_count=F('reviews_count') + 1,
+            trending_score=LogAddExp(
+                'trending_score',
+                Value(review_weight(instance.score, instance.pub_date)),
+            ),
+        )
+        count_scores(instance.title_id, {instance.score: 1})
+    elif old_score is None:
+        refresh_title_aggregates([instance.title_id])
+    elif old_score != instance.score:
+        Title.objects.filter(pk=instance.title_id).update(
+            score_sum=F('score_sum') + instance.score - old_score
+        )
+        count_scores(instance.title_id, {old_score: -1, instance.score: 1})
+    instance._loaded_score = instance.score
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    Title.objects.filter(pk=instance.title_id).update(
+        score_sum=F('score_sum') - instance.score,
+        reviews_count=F('reviews_count') - 1,
+    )
+    count_scores(instance.title_id, {instance.score: -1})
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Review.objects.filter(pk=instance.review_id).update(
+            comments_count=F('comments_count') + 1
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Review.objects.filter(pk=instance.review_id).update(
+        comments_count=F('comments_count') - 1
+    )
+
+
+def bump_model_version(sender, raw=False, **kwargs):
+    if not raw:
+        bump_versions(sender)
+
+
+for model in VERSIONED_MODELS:
+    post_save.connect(bump_model_version, sender=model)
+    post_delete.connect(bump_model_version, sender=model)
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump_versions(Title)
@@ -0,0 +1,62 @@
+"""Time-decayed review activity of titles.
+
+Every review adds score * exp(-rate * age) to the activity of its title.
+Instead of decaying stored values as time passes, review weights are
+measured against a fixed epoch (forward decay): a review published later
+weighs exp(rate * seconds since epoch) more. The ratio between any two
+titles is the same either way, so the stored value orders titles correctly
+at any moment and only changes on review writes. Values are kept as
+natural logarithms so they never overflow.
+"""
+import math
+from datetime import datetime
+
+from django.conf import settings
+from django.db.models import Func
+from django.utils import timezone
+
+EPOCH = datetime(2023, 1, 1, tzinfo=timezone.utc)
+SQL_FUNCTION = 'yamdb_logaddexp'
+
+
+def log_add_exp(first, second):
+    if first is None:
+        return second
+    if second is None:
+        return first
+    high, low = max(first, second), min(first, second)
+    return high + math.log1p(math.exp(low - high))
+
+
+class LogAddExp(Func):
+    function = SQL_FUNCTION
+    arity = 2
+
+
+def register_sql_function(sender, connection, **kwargs):
+    if connection.vendor == 'sqlite':
+        connection.connection.create_function(
+            SQL_FUNCTION, 2, log_add_exp, deterministic=True
+        )
+
+
+def review_weight(score, pub_date):
+    """Log weight of a review, None for a review without a score."""
+    if score < 1:
+        return None
+    rate = math.log(2) / (settings.TRENDING_HALF_LIFE_HOURS * 3600)
+    return math.log(score) + rate * (pub_date - EPOCH).total_seconds()
+
+
+def trending_scores(reviews):
+    """Yield (title_id, trending_score) from (title_id, score, pub_date)
+    rows ordered by title_id."""
+    title_id = total = None
+    for review_title_id, score, pub_date in reviews:
+        if review_title_id != title_id:
+            if title_id is not None:
+                yield title_id, total
+            title_id, total = review_title_id, None
+        total = log_add_exp(total, review_weight(score, pub_date))
+    if title_id is not None:
+        yield title_id, total
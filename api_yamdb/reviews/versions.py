@@ -0,0 +1,28 @@
+from django.db.models import F
+from django.utils import timezone
+
+from .models import ModelVersion
+
+
+def model_label(model):
+    return model._meta.label_lower
+
+
+def bump_versions(*models):
+    now = timezone.now()
+    for model in models:
+        label = model_label(model)
+        updated = ModelVersion.objects.filter(model=label).update(
+            version=F('version') + 1, modified=now
+        )
+        if not updated:
+            ModelVersion.objects.get_or_create(
+                model=label, defaults={'version': 1, 'modified': now}
+            )
+
+
+def get_versions(*models):
+    labels = [model_label(model) for model in models]
+    stored = ModelVersion.objects.in_bulk(labels)
+    return [stored.get(label) or ModelVersion(model=label)
+            for label in labels]
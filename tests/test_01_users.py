@@ -415,7 +415,9 @@ class Test01UserAPI:
             'Проверьте, что DELETE-запрос администратора к '
             '`/api/v1/users/{username}/` возвращает ответ со статусом 204.'
         )
-        assert django_user_model.objects.count() == (users_cnt - 1), (
+        assert django_user_model.objects.filter(
+            is_deleted=False
+        ).count() == (users_cnt - 1), (
             'Проверьте, что DELETE-запрос администратора к '
             '`/api/v1/users/{username}/` удаляет пользователя.'
         )
@@ -456,7 +458,9 @@ class Test01UserAPI:
             'Проверьте, что DELETE-запрос суперпользователя к '
             '`/api/v1/users/{username}/` возвращает ответ со статусом 204.'
         )
-        assert django_user_model.objects.count() == (users_cnt - 1), (
+        assert django_user_model.objects.filter(
+            is_deleted=False
+        ).count() == (users_cnt - 1), (
             'Проверьте, что DELETE-запрос суперпользователя к '
             '`/api/v1/users/{username}/` удаляет пользователя.'
         )
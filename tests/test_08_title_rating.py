@@ -0,0 +1,138 @@
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+
+from reviews.models import Review, ScoreHistogram, Title
+from tests.utils import create_comments, create_reviews, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    def test_01_rating_follows_review_changes(self, admin_client, admin,
+                                              user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        create_single_review(admin_client, titles[0]['id'], 'Так себе', 2)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        assert admin_client.get(url).json()['rating'] == 3, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'добавлении отзыва.'
+        )
+
+        admin_client.patch(
+            f'{url}reviews/{reviews[0]["id"]}/', data={'score': 10}
+        )
+        assert admin_client.get(url).json()['rating'] == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        assert admin_client.get(url).json()['rating'] == 2, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'удалении отзыва.'
+        )
+
+        admin.delete()
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert (title.score_sum, title.reviews_count) == (0, 0), (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'каскадном удалении отзывов вместе с автором.'
+        )
+
+    def test_02_rebuild_aggregates_command(self, admin_client, user_client,
+                                           user, client):
+        _, titles = create_reviews(admin_client, {user: user_client})
+        Title.objects.update(score_sum=0, reviews_count=0)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(url).json()['rating'] is None
+
+        with pytest.raises(CommandError):
+            call_command('rebuild_aggregates', check=True, stdout=StringIO())
+
+        call_command('rebuild_aggregates', stdout=StringIO())
+        title = Title.objects.get(pk=titles[0]['id'])
+        assert title.score_sum == Review.objects.get().score, (
+            'Проверьте, что команда `rebuild_aggregates` пересчитывает '
+            'сохранённые агрегаты отзывов.'
+        )
+        assert title.reviews_count == 1
+        assert client.get(url).json()['rating'] == title.rating, (
+            'Проверьте, что команда `rebuild_aggregates` сбрасывает кэш '
+            'ответов с произведениями.'
+        )
+        call_command('rebuild_aggregates', check=True, stdout=StringIO())
+
+    def test_03_score_histogram(self, admin_client, user_client, user,
+                                client):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+        create_single_review(admin_client, titles[0]['id'], 'Так себе', 2)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+
+        assert 'score_histogram' not in client.get(url).json(), (
+            'Проверьте, что распределение оценок возвращается только по '
+            'запросу `?expand=score_histogram`.'
+        )
+        admin_client.patch(
+            f'{url}reviews/{reviews[0]["id"]}/', data={'score': 9}
+        )
+        histogram = client.get(
+            url, {'expand': 'score_histogram'}
+        ).json()['score_histogram']
+        expected = {str(score): 0 for score in range(1, 11)}
+        expected.update({'2': 1, '9': 1})
+        assert histogram == expected, (
+            'Проверьте, что распределение оценок обновляется при создании '
+            'и изменении отзывов.'
+        )
+
+        admin_client.delete(f'{url}reviews/{reviews[0]["id"]}/')
+        data = client.get(
+            '/api/v1/titles/', {'expand': 'score_histogram'}
+        ).json()
+        histograms = {title['id']: title['score_histogram']
+                      for title in data['results']}
+        expected['9'] = 0
+        assert histograms[titles[0]['id']] == expected
+        assert sum(histograms[titles[1]['id']].values()) == 0
+
+        ScoreHistogram.objects.update(score_2=5)
+        with pytest.raises(CommandError):
+            call_command('rebuild_aggregates', check=True, stdout=StringIO())
+        call_command('rebuild_aggregates', stdout=StringIO())
+        call_command('rebuild_aggregates', check=True, stdout=StringIO())
+
+    def test_04_reviews_and_comments_count(self, admin_client, admin,
+                                           user_client, user, client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        reviews_url = f'{title_url}reviews/'
+
+        assert client.get(title_url).json()['reviews_count'] == 2, (
+            f'Проверьте, что ответ `{title_url}` содержит `reviews_count`.'
+        )
+        data = client.get(reviews_url).json()['results']
+        counts = {review['id']: review['comments_count'] for review in data}
+        assert counts == {reviews[0]['id']: 2, reviews[1]['id']: 0}, (
+            f'Проверьте, что отзывы в `{reviews_url}` содержат '
+            '`comments_count`.'
+        )
+
+        admin_client.delete(
+            f'{reviews_url}{reviews[0]["id"]}/comments/{comments[0]["id"]}/'
+        )
+        review = client.get(f'{reviews_url}{reviews[0]["id"]}/').json()
+        assert review['comments_count'] == 1
+
+        user.delete()
+        assert client.get(title_url).json()['reviews_count'] == 1
+        review = client.get(f'{reviews_url}{reviews[0]["id"]}/').json()
+        assert review['comments_count'] == 0, (
+            'Проверьте, что счётчик комментариев уменьшается при каскадном '
+            'удалении комментариев вместе с автором.'
+        )
+        call_command('rebuild_aggregates', check=True, stdout=StringIO())
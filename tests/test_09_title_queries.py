@@ -0,0 +1,45 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return len(context.captured_queries)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    def test_01_title_list_queries_do_not_grow(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        queries_for_two = count_queries(admin_client, url)
+
+        for idx in range(5):
+            admin_client.post(url, data={
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': titles[0]['genre'],
+                'category': titles[0]['category'],
+            })
+        queries_for_seven = count_queries(admin_client, url)
+
+        assert queries_for_seven == queries_for_two, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет фиксированное '
+            'количество запросов к базе данных независимо от числа '
+            'произведений на странице.'
+        )
+
+    def test_02_title_detail_queries(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert count_queries(admin_client, url) == 3, (
+            f'Проверьте, что GET-запрос к `{url}` загружает произведение '
+            'вместе с категорией и жанрами за два запроса (плюс запрос '
+            'версий данных).'
+        )
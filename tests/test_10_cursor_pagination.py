@@ -0,0 +1,50 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    def test_01_genre_cursor_pages(self, admin_client, client):
+        url = '/api/v1/genres/'
+        expected = []
+        for idx in range(15):
+            data = {'name': f'Жанр {idx:02}', 'slug': f'genre-{idx}'}
+            admin_client.post(url, data=data)
+            expected.append(data)
+
+        response = client.get(url, {'pagination': 'cursor'})
+        data = response.json()
+        assert 'count' not in data, (
+            f'Проверьте, что при курсорной пагинации `{url}` ответ не '
+            'содержит ключ `count`.'
+        )
+        results = data['results']
+        response = client.get(data['next'])
+        results.extend(response.json()['results'])
+
+        assert results == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` возвращает все '
+            'объекты по порядку без пропусков и повторов.'
+        )
+        assert response.json()['next'] is None
+
+    def test_02_page_number_is_default(self, client):
+        data = client.get('/api/v1/titles/').json()
+        assert 'count' in data, (
+            'Проверьте, что пагинация по номеру страницы остаётся '
+            'пагинацией по умолчанию.'
+        )
+
+    def test_03_no_cursor_for_ranked_search(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        for url in ('/api/v1/titles/',
+                    f'/api/v1/titles/{titles[0]["id"]}/reviews/'):
+            response = client.get(url, {'search': 'крепк',
+                                        'pagination': 'cursor'})
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}` не применяет курсорную пагинацию к '
+                'результатам поиска, упорядоченным по релевантности.'
+            )
+            assert client.get(url, {'search': 'крепк'}).status_code == 200
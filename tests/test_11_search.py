@@ -0,0 +1,49 @@
+import pytest
+
+from tests.utils import create_comments, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11Search:
+
+    def test_01_title_search(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+
+        data = client.get(url, {'search': 'крепк'}).json()
+        assert [title['id'] for title in data['results']] == [
+            titles[1]['id']
+        ], (
+            f'Проверьте, что `{url}?search=` находит произведения по началу '
+            'слова в названии.'
+        )
+
+        admin_client.patch(
+            f'{url}{titles[1]["id"]}/', data={'name': 'Бриллиантовая рука'}
+        )
+        assert client.get(url, {'search': 'крепкий'}).json()['count'] == 0, (
+            f'Проверьте, что поисковый индекс `{url}` обновляется при '
+            'изменении произведения.'
+        )
+        data = client.get(url, {'search': 'back'}).json()
+        assert data['count'] == 1, (
+            f'Проверьте, что `{url}?search=` ищет и по описанию произведения.'
+        )
+
+    def test_02_review_search(self, admin_client, admin, user_client, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(
+            f'{url}{reviews[1]["id"]}/comments/', data={'text': 'number 2'}
+        )
+
+        data = user_client.get(url, {'search': 'number 2'}).json()
+        found = [review['id'] for review in data['results']]
+        assert found == [reviews[1]['id'], reviews[0]['id']], (
+            f'Проверьте, что `{url}?search=` сначала возвращает отзывы с '
+            'совпадением в тексте, а затем отзывы с совпадением в '
+            'комментариях.'
+        )
+        assert user_client.get(url, {'search': '"'}).json()['count'] == 0
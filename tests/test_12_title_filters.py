@@ -0,0 +1,46 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+def title_ids(client, params):
+    response = client.get('/api/v1/titles/', params)
+    assert response.status_code == 200
+    return sorted(title['id'] for title in response.json()['results'])
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12TitleFilters:
+
+    def test_01_multi_value_filters(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        terminator, die_hard = titles[0]['id'], titles[1]['id']
+
+        assert title_ids(client, {'genre': 'horror,drama'}) == sorted(
+            [terminator, die_hard]
+        ), 'Проверьте фильтр по нескольким жанрам через запятую.'
+        assert title_ids(
+            client, {'genre': 'horror,comedy', 'genre_match': 'all'}
+        ) == [terminator], (
+            'Проверьте, что `genre_match=all` оставляет только произведения '
+            'со всеми указанными жанрами.'
+        )
+        assert title_ids(
+            client, {'genre': 'horror,drama', 'genre_match': 'all'}
+        ) == []
+        assert title_ids(client, {'category': 'films,books'}) == sorted(
+            [terminator, die_hard]
+        ), 'Проверьте фильтр по нескольким категориям через запятую.'
+        assert title_ids(
+            client, {'year_min': 1985, 'year_max': 1990}
+        ) == [die_hard], 'Проверьте фильтр по диапазону годов.'
+
+    def test_02_invalid_year_bound(self, client):
+        response = client.get('/api/v1/titles/', {'year_min': 'давно'})
+        assert response.status_code == 400
+        for url in ('/api/v1/titles/', '/api/v1/titles/facets/'):
+            response = client.get(url, {'year': 'abc'})
+            assert response.status_code == 400, (
+                f'Проверьте, что `{url}?year=` с нечисловым значением '
+                'возвращает ответ со статусом 400.'
+            )
@@ -0,0 +1,105 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    def test_01_anonymous_reads_are_cached(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/'
+        expected = client.get(url).json()
+
+        with CaptureQueriesContext(connection) as context:
+            assert client.get(url).json() == expected
+        assert len(context.captured_queries) == 1, (
+            f'Проверьте, что повторный анонимный GET-запрос к `{url}` '
+            'берётся из кэша и читает только версии данных.'
+        )
+
+    def test_02_writes_invalidate_cache(self, admin_client, client,
+                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        assert client.get(title_url).json()['rating'] is None
+
+        create_single_review(user_client, titles[0]['id'], 'Отлично', 9)
+        assert client.get(title_url).json()['rating'] == 9, (
+            f'Проверьте, что кэш `{title_url}` сбрасывается при '
+            'добавлении отзыва.'
+        )
+
+        genres_url = '/api/v1/genres/'
+        count = client.get(genres_url).json()['count']
+        admin_client.post(genres_url, data={'name': 'Вестерн',
+                                            'slug': 'western'})
+        assert client.get(genres_url).json()['count'] == count + 1, (
+            f'Проверьте, что кэш `{genres_url}` сбрасывается при '
+            'добавлении жанра.'
+        )
+
+        admin_client.patch(title_url, data={'genre': ['western']})
+        genres = client.get(title_url).json()['genre']
+        assert [genre['slug'] for genre in genres] == ['western'], (
+            f'Проверьте, что кэш `{title_url}` сбрасывается при изменении '
+            'жанров произведения.'
+        )
+
+    def test_03_conditional_get(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        response = client.get(url)
+        etag = response['ETag']
+        modified = response['Last-Modified']
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным `ETag` в '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert len(context.captured_queries) == 1
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=modified)
+        assert response.status_code == 304
+
+        admin_client.post('/api/v1/genres/', data={'name': 'Вестерн',
+                                                   'slug': 'western'})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            f'Проверьте, что после изменения данных GET-запрос к `{url}` '
+            'со старым `ETag` возвращает полный ответ.'
+        )
+        assert response['ETag'] != etag
+
+    def test_04_conditional_get_of_missing_title(self, admin_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = client.get(url)
+        modified = response['Last-Modified']
+        assert client.get(
+            url, HTTP_IF_MODIFIED_SINCE=modified
+        ).status_code == 304
+
+        missing_url = '/api/v1/titles/99999/'
+        response = client.get(missing_url, HTTP_IF_MODIFIED_SINCE=modified)
+        assert response.status_code == 404, (
+            'Проверьте, что условный GET-запрос к несуществующему '
+            'произведению возвращает 404, а не 304.'
+        )
+
+    def test_05_etag_depends_on_media_type(self, admin_client, client):
+        create_titles(admin_client)
+        url = '/api/v1/titles/'
+        json_etag = client.get(url)['ETag']
+        html_etag = client.get(url, HTTP_ACCEPT='text/html')['ETag']
+        assert json_etag != html_etag, (
+            'Проверьте, что `ETag` различается для JSON и HTML-представления '
+            'ответа.'
+        )
+        response = client.get(
+            url, HTTP_ACCEPT='text/html', HTTP_IF_NONE_MATCH=json_etag
+        )
+        assert response.status_code == 200
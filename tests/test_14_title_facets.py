@@ -0,0 +1,42 @@
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14TitleFacets:
+
+    def test_01_facet_counts(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        admin_client.post('/api/v1/titles/', data={
+            'name': 'Терминатор 2',
+            'year': 1991,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        url = '/api/v1/titles/facets/'
+
+        response = client.get(url)
+        assert response.status_code == 200, (
+            f'Проверьте, что эндпоинт `{url}` доступен без авторизации.'
+        )
+        data = response.json()
+        assert data['count'] == 3
+        assert data['genre'] == [
+            {'slug': 'drama', 'name': 'Драма', 'count': 1},
+            {'slug': 'comedy', 'name': 'Комедия', 'count': 1},
+            {'slug': 'horror', 'name': 'Ужасы', 'count': 2},
+        ], f'Проверьте подсчёт произведений по жанрам в `{url}`.'
+        assert data['category'] == [
+            {'slug': 'books', 'name': 'Книги', 'count': 1},
+            {'slug': 'films', 'name': 'Фильм', 'count': 2},
+        ], f'Проверьте подсчёт произведений по категориям в `{url}`.'
+        assert [year['year'] for year in data['year']] == [1984, 1988, 1991]
+
+        data = client.get(url, {'genre': 'horror'}).json()
+        assert data['count'] == 2, (
+            f'Проверьте, что `{url}` учитывает фильтры списка произведений.'
+        )
+        assert data['category'] == [
+            {'slug': 'films', 'name': 'Фильм', 'count': 2}
+        ]
@@ -0,0 +1,94 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15Trending:
+
+    def test_01_trending_order(self, admin_client, user_client, client):
+        titles, _, _ = create_titles(admin_client)
+        url = '/api/v1/titles/trending/'
+        assert client.get(url).json()['results'] == [], (
+            f'Проверьте, что `{url}` не содержит произведений без отзывов.'
+        )
+
+        create_single_review(user_client, titles[0]['id'], 'Неплохо', 5)
+        create_single_review(user_client, titles[1]['id'], 'Шедевр', 9)
+        create_single_review(admin_client, titles[0]['id'], 'Скучно', 2)
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            f'Проверьте, что `{url}` упорядочивает произведения по '
+            'взвешенной активности отзывов.'
+        )
+
+    def test_02_rebuild_matches_incremental(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Неплохо', 5)
+        create_single_review(admin_client, titles[0]['id'], 'Скучно', 2)
+        incremental = Title.objects.get(pk=titles[0]['id']).trending_score
+
+        call_command('rebuild_trending', stdout=StringIO())
+        rebuilt = Title.objects.get(pk=titles[0]['id']).trending_score
+        assert rebuilt == pytest.approx(incremental), (
+            'Проверьте, что команда `rebuild_trending` пересчитывает '
+            'популярность так же, как инкрементальное обновление.'
+        )
+        assert Title.objects.get(pk=titles[1]['id']).trending_score is None
+
+    def test_03_rebuild_resets_cache(self, admin_client, user_client,
+                                     client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Неплохо', 5)
+        create_single_review(user_client, titles[1]['id'], 'Шедевр', 9)
+        url = '/api/v1/titles/trending/'
+        response = client.get(url)
+        etag = response['ETag']
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id'], titles[0]['id']
+        ]
+
+        Title.objects.filter(pk=titles[0]['id']).update(trending_score=0)
+        call_command('rebuild_trending', stdout=StringIO())
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что команда `rebuild_trending` сбрасывает кэш '
+            f'ответов `{url}`.'
+        )
+
+    def test_04_review_without_score(self, admin_client, admin):
+        titles, _, _ = create_titles(admin_client)
+        title = Title.objects.get(pk=titles[0]['id'])
+        Review.objects.create(title=title, author=admin, text='Без оценки')
+        title.refresh_from_db()
+        assert title.trending_score is None, (
+            'Проверьте, что отзыв без оценки не влияет на популярность '
+            'произведения.'
+        )
+        call_command('rebuild_trending', stdout=StringIO())
+        title.refresh_from_db()
+        assert title.trending_score is None
+
+    def test_05_trending_cursor_pages(self, admin_client, user_client,
+                                      client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Шедевр', 9)
+        create_single_review(user_client, titles[1]['id'], 'Неплохо', 5)
+        url = '/api/v1/titles/trending/'
+        expected = [titles[0]['id'], titles[1]['id']]
+        data = client.get(url).json()
+        assert [title['id'] for title in data['results']] == expected
+
+        data = client.get(url, {'pagination': 'cursor'}).json()
+        assert [title['id'] for title in data['results']] == expected, (
+            f'Проверьте, что курсорная пагинация `{url}` сохраняет порядок '
+            'по популярности.'
+        )
@@ -0,0 +1,97 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16BulkCreate:
+
+    def test_01_bulk_titles(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/'
+        data = [
+            {
+                'name': f'Произведение {idx}',
+                'year': 2000 + idx,
+                'genre': [genres[0]['slug'], genres[idx % 3]['slug']],
+                'category': categories[idx % 2]['slug'],
+            }
+            for idx in range(20)
+        ]
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST-запрос администратора к `{url}` со списком '
+            'произведений возвращает ответ со статусом 201.'
+        )
+        assert len(context.captured_queries) < 15, (
+            f'Проверьте, что пакетное создание в `{url}` выполняет '
+            'фиксированное количество запросов.'
+        )
+        queries = [query['sql'] for query in context.captured_queries]
+        lock = next(index for index, sql in enumerate(queries)
+                    if sql.startswith('UPDATE sqlite_sequence'))
+        last_id = next(index for index, sql in enumerate(queries)
+                       if 'MAX(' in sql)
+        assert lock < last_id, (
+            f'Проверьте, что пакетное создание в `{url}` захватывает '
+            'блокировку записи до чтения последнего id.'
+        )
+        created = response.json()
+        assert [item['name'] for item in created] == [
+            item['name'] for item in data
+        ]
+        title = Title.objects.get(pk=created[4]['id'])
+        assert sorted(title.genre.values_list('slug', flat=True)) == sorted(
+            {genres[0]['slug'], genres[1]['slug']}
+        )
+        assert admin_client.get(url).json()['count'] == 20
+
+    def test_02_bulk_errors_per_item(self, admin_client):
+        genres = create_genre(admin_client)
+        categories = create_categories(admin_client)
+        url = '/api/v1/titles/'
+        data = [
+            {'name': 'Хорошее', 'year': 2000, 'genre': [genres[0]['slug']],
+             'category': categories[0]['slug']},
+            {'name': 'Плохое', 'year': 2000, 'genre': ['unknown'],
+             'category': 'unknown'},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert set(errors[1]) == {'genre', 'category'}, (
+            f'Проверьте, что пакетное создание в `{url}` возвращает ошибки '
+            'для каждого элемента списка.'
+        )
+        assert not Title.objects.exists()
+
+    def test_03_bulk_genres_and_categories(self, admin_client):
+        create_genre(admin_client)
+        url = '/api/v1/genres/'
+        data = [
+            {'name': 'Вестерн', 'slug': 'western'},
+            {'name': 'Ужасы', 'slug': 'horror'},
+            {'name': 'Ещё вестерн', 'slug': 'western'},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert errors[0] == {}
+        assert 'slug' in errors[1] and 'slug' in errors[2], (
+            f'Проверьте, что пакетное создание в `{url}` проверяет '
+            'уникальность слагов в базе и внутри запроса.'
+        )
+
+        response = admin_client.post(
+            '/api/v1/categories/',
+            data=[{'name': 'Музыка', 'slug': 'music'}], format='json'
+        )
+        assert response.status_code == 201
+        assert response.json() == [{'name': 'Музыка', 'slug': 'music'}]
@@ -0,0 +1,125 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment
+from tests.utils import create_titles
+
+
+def data_queries(context):
+    return [query['sql'] for query in context.captured_queries
+            if not query['sql'].startswith(('BEGIN', 'SAVEPOINT',
+                                            'RELEASE SAVEPOINT'))]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17ReviewWrites:
+
+    def test_01_review_create_and_update_queries(self, admin_client,
+                                                 user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        admin_client.post(url, data={'text': 'Нет', 'score': 1})
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Да', 'score': 7})
+        assert response.status_code == 201
+        assert len(data_queries(context)) == 6, (
+            f'Проверьте, что POST-запрос к `{url}` выполняет только запросы '
+            'пользователя и произведения, вставку отзыва, обновление '
+            'рейтинга, распределения оценок и версии.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{url}{response.json()["id"]}/', data={'score': 3}
+            )
+        assert response.status_code == 200
+        assert len(data_queries(context)) == 5, (
+            f'Проверьте, что PATCH-запрос к `{url}<id>/` читает отзыв одним '
+            'запросом и обновляет отзыв, рейтинг, распределение оценок и '
+            'версию, а пользователя берёт из кеша аутентификации.'
+        )
+
+    def test_02_duplicate_review(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        user_client.post(url, data={'text': 'Да', 'score': 7})
+        response = user_client.post(url, data={'text': 'Нет', 'score': 2})
+        assert response.status_code == 400, (
+            f'Проверьте, что повторный отзыв через `{url}` возвращает ответ '
+            'со статусом 400.'
+        )
+        assert 'non_field_errors' in response.json()
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 7
+
+        response = user_client.post(
+            '/api/v1/titles/99999/reviews/', data={'text': 'Да', 'score': 7}
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что отзыв к несуществующему произведению возвращает '
+            'ответ со статусом 404.'
+        )
+
+    def test_03_nested_comment_queries(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        review = user_client.post(
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/',
+            data={'text': 'Да', 'score': 7}
+        ).json()
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/{review["id"]}/'
+               'comments/')
+        comment = user_client.post(url, data={'text': 'Первый'}).json()
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.patch(
+                f'{url}{comment["id"]}/', data={'text': 'Исправлено'}
+            )
+        assert response.status_code == 200
+        assert len(data_queries(context)) == 2, (
+            f'Проверьте, что PATCH-запрос к `{url}<id>/` находит комментарий '
+            'с отзывом и автором одним запросом.'
+        )
+
+        for idx in range(3):
+            admin_client.post(url, data={'text': f'Ответ {idx}'})
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.json()['count'] == 4
+        assert len(data_queries(context)) == 3, (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+            'комментариев вместе с комментариями.'
+        )
+
+        response = user_client.get(
+            f'/api/v1/titles/{titles[1]["id"]}/reviews/{review["id"]}/'
+            f'comments/{comment["id"]}/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарий недоступен по пути с чужим '
+            'произведением.'
+        )
+
+    def test_04_review_delete_with_comments(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        review = user_client.post(url, data={'text': 'Да', 'score': 7}).json()
+        for idx in range(5):
+            admin_client.post(f'{url}{review["id"]}/comments/',
+                              data={'text': f'Ответ {idx}'})
+
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.delete(f'{url}{review["id"]}/')
+        assert response.status_code == 204
+        counter_updates = [
+            sql for sql in data_queries(context)
+            if sql.startswith('UPDATE "reviews_review"')
+        ]
+        assert not counter_updates, (
+            f'Проверьте, что DELETE-запрос к `{url}<id>/` не обновляет '
+            'счётчик комментариев удаляемого отзыва для каждого комментария.'
+        )
+        assert not Comment.objects.exists()
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['reviews_count'] == 0
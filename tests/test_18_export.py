@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from tests.utils import create_comments
+
+
+def read_ndjson(response):
+    content = b''.join(response.streaming_content).decode()
+    return [json.loads(line) for line in content.splitlines()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18Export:
+    url = '/api/v1/reviews/export/'
+
+    def test_01_export_permissions(self, client, user_client, admin_client):
+        assert client.get(self.url).status_code == 401, (
+            f'Проверьте, что GET-запрос неавторизованного пользователя к '
+            f'`{self.url}` возвращает ответ со статусом 401.'
+        )
+        assert user_client.get(self.url).status_code == 403, (
+            f'Проверьте, что GET-запрос пользователя к `{self.url}` '
+            'возвращает ответ со статусом 403.'
+        )
+        assert admin_client.get(f'{self.url}?title=x').status_code == 400
+
+    def test_02_export_reviews(self, admin_client, user_client, admin, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = admin_client.get(self.url)
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        rows = read_ndjson(response)
+        assert [row['id'] for row in rows] == [
+            review['id'] for review in reviews
+        ], (
+            f'Проверьте, что `{self.url}` отдаёт по строке на каждый отзыв '
+            'в порядке id.'
+        )
+        assert rows[0]['author'] == admin.username
+        assert rows[0]['title_id'] == titles[0]['id']
+        assert rows[0]['comments_count'] == len(comments)
+        assert 'comments' not in rows[0]
+
+        response = admin_client.get(
+            f'{self.url}?title={titles[1]["id"]}&expand=comments'
+        )
+        assert read_ndjson(response) == []
+
+        response = admin_client.get(
+            f'{self.url}?title={titles[0]["id"]}&expand=comments'
+        )
+        rows = read_ndjson(response)
+        assert [comment['id'] for comment in rows[0]['comments']] == [
+            comment['id'] for comment in comments
+        ], (
+            f'Проверьте, что `{self.url}?expand=comments` добавляет к отзыву '
+            'его комментарии.'
+        )
+        assert rows[0]['comments'][0]['author'] == admin.username
+        assert rows[1]['comments'] == []
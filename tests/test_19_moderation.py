@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.aggregates import stale_review_aggregates, stale_title_aggregates
+from reviews.models import Comment, Review
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19Moderation:
+    url = '/api/v1/moderation/delete/'
+
+    def test_01_moderation_permissions(self, user_client, moderator_client):
+        response = user_client.post(self.url, data={'author': 'spam'})
+        assert response.status_code == 403, (
+            f'Проверьте, что POST-запрос пользователя к `{self.url}` '
+            'возвращает ответ со статусом 403.'
+        )
+        response = moderator_client.post(self.url, data={})
+        assert response.status_code == 400, (
+            f'Проверьте, что POST-запрос к `{self.url}` без id и фильтров '
+            'возвращает ответ со статусом 400.'
+        )
+
+    def test_02_delete_by_ids(self, admin_client, moderator_client,
+                              user_client, admin, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = moderator_client.post(
+            self.url, data={'comments': [comments[1]['id']]},
+            format='json'
+        )
+        assert response.status_code == 200
+        assert response.json() == {'reviews': 0, 'comments': 1}
+        assert Review.objects.get(pk=reviews[0]['id']).comments_count == 1
+
+        with CaptureQueriesContext(connection) as context:
+            response = moderator_client.post(
+                self.url, data={'reviews': [reviews[0]['id']]},
+                format='json'
+            )
+        assert response.json() == {'reviews': 1, 'comments': 1}, (
+            f'Проверьте, что `{self.url}` удаляет отзыв вместе с его '
+            'комментариями и возвращает количество удалённых объектов.'
+        )
+        assert not stale_title_aggregates().exists(), (
+            'Проверьте, что массовое удаление пересчитывает рейтинг '
+            'произведений.'
+        )
+        assert not any(
+            'SUM(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что массовое удаление вычитает удалённые отзывы из '
+            'рейтинга, а не пересчитывает его по всем отзывам.'
+        )
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 5
+
+    def test_03_delete_by_filter(self, admin_client, moderator_client,
+                                 user_client, admin, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        response = moderator_client.post(
+            self.url,
+            data={'author': user.username, 'title': titles[0]['id']},
+            format='json'
+        )
+        assert response.json() == {'reviews': 1, 'comments': 1}, (
+            f'Проверьте, что `{self.url}` удаляет отзывы и комментарии '
+            'автора по фильтру.'
+        )
+        assert list(Review.objects.values_list('pk', flat=True)) == [
+            reviews[0]['id']
+        ]
+        assert list(Comment.objects.values_list('pk', flat=True)) == [
+            comments[0]['id']
+        ]
+        assert not stale_review_aggregates().exists()
+        assert not stale_title_aggregates().exists()
+
+        response = moderator_client.post(
+            self.url, data={'until': '2000-01-01T00:00:00Z'},
+            format='json'
+        )
+        assert response.json() == {'reviews': 0, 'comments': 0}
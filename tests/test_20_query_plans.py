@@ -0,0 +1,65 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+def query_plans(context):
+    for query in context.captured_queries:
+        if not query['sql'].startswith('SELECT'):
+            continue
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {query["sql"]}')
+            yield query['sql'], [row[-1] for row in cursor.fetchall()]
+
+
+def bad_steps(plan):
+    return [step for step in plan if 'TEMP B-TREE' in step
+            or step.startswith('SCAN') and ' USING ' not in step
+            and not step.startswith('SCAN (subquery')]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20QueryPlans:
+
+    def test_01_list_queries_use_indexes(self, admin_client, user_client,
+                                         admin, user):
+        _, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?pagination=cursor',
+            '/api/v1/titles/?category=movie',
+            '/api/v1/titles/trending/',
+            '/api/v1/genres/',
+            '/api/v1/categories/',
+            '/api/v1/users/',
+            f'{title_url}reviews/',
+            f'{title_url}reviews/?pagination=cursor',
+            f'{title_url}reviews/?expand=comments',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+            '?pagination=cursor',
+        )
+        for url in urls:
+            with CaptureQueriesContext(connection) as context:
+                response = admin_client.get(url)
+            assert response.status_code == 200
+            for sql, plan in query_plans(context):
+                assert not bad_steps(plan), (
+                    f'Проверьте, что запросы `{url}` не сортируют во '
+                    'временном B-дереве и не сканируют таблицу без индекса: '
+                    f'{sql}\n{plan}'
+                )
+
+    def test_02_title_genres_ordered_by_name(self, admin_client, client):
+        create_comments(admin_client, {})
+        for title in client.get('/api/v1/titles/').json()['results']:
+            names = [genre['name'] for genre in title['genre']]
+            assert names == sorted(names), (
+                'Проверьте, что жанры произведения в `/api/v1/titles/` '
+                'упорядочены по названию.'
+            )
@@ -0,0 +1,105 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title, User
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21DeferredDeletes:
+
+    def test_01_title_destroy_hides_title(self, admin_client, user_client,
+                                          moderator_client, admin, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        response = admin_client.delete(title_url)
+        assert response.status_code == 204
+        assert Review.objects.filter(title_id=titles[0]['id']).count() == 2, (
+            'Проверьте, что удаление произведения не удаляет отзывы сразу.'
+        )
+        for url in (
+            title_url,
+            f'{title_url}reviews/',
+            f'{title_url}reviews/{reviews[0]["id"]}/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/',
+            f'{title_url}reviews/{reviews[0]["id"]}/comments/'
+            f'{comments[0]["id"]}/',
+        ):
+            assert admin_client.get(url).status_code == 404, (
+                f'Проверьте, что после удаления произведения `{url}` '
+                'возвращает ответ со статусом 404.'
+            )
+        response = admin_client.get('/api/v1/titles/')
+        assert titles[0]['id'] not in [
+            title['id'] for title in response.json()['results']
+        ]
+        response = moderator_client.post(
+            f'{title_url}reviews/', data={'text': 'Да', 'score': 5}
+        )
+        assert response.status_code == 404
+
+        call_command('purge_deleted', pause=0)
+        assert not Title.objects.filter(pk=titles[0]['id']).exists()
+        assert not Review.objects.filter(title_id=titles[0]['id']).exists()
+        assert not Comment.objects.exists(), (
+            'Проверьте, что команда `purge_deleted` удаляет отзывы и '
+            'комментарии скрытого произведения.'
+        )
+
+    def test_02_user_destroy_hides_user(self, admin_client, user_client,
+                                        admin, user):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        assert not any(
+            'SUM(' in query['sql'] for query in context.captured_queries
+        ), (
+            'Проверьте, что удаление пользователя вычитает его отзывы из '
+            'рейтинга, а не пересчитывает рейтинг по всем отзывам.'
+        )
+        user.refresh_from_db()
+        assert user.is_deleted and not user.is_active
+        response = admin_client.get('/api/v1/users/')
+        assert user.username not in [
+            item['username'] for item in response.json()['results']
+        ]
+        assert admin_client.get(
+            f'/api/v1/users/{user.username}/'
+        ).status_code == 404
+        assert user_client.get('/api/v1/users/me/').status_code == 401, (
+            'Проверьте, что токен удалённого пользователя не принимается.'
+        )
+        review_url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+                      f'{reviews[0]["id"]}/')
+        response = admin_client.get(f'{review_url}comments/')
+        assert [comment['id'] for comment in response.json()['results']] == [
+            comments[0]['id']
+        ]
+        assert admin_client.get(review_url).json()['comments_count'] == 1
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['reviews_count'] == 1, (
+            'Проверьте, что рейтинг произведения сразу перестаёт учитывать '
+            'отзывы удалённого пользователя.'
+        )
+        call_command('rebuild_aggregates', check=True, stdout=StringIO())
+
+        call_command('purge_deleted', pause=0)
+        assert not User.objects.filter(pk=user.pk).exists()
+        assert list(Review.objects.values_list('pk', flat=True)) == [
+            reviews[0]['id']
+        ]
+        assert admin_client.get(review_url).json()['comments_count'] == 1
+        response = admin_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['reviews_count'] == 1, (
+            'Проверьте, что `purge_deleted` пересчитывает рейтинг '
+            'произведений.'
+        )
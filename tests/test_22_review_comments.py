@@ -0,0 +1,48 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22ReviewComments:
+
+    def test_01_expand_comments(self, admin_client, user_client,
+                                moderator_client, admin, user, moderator):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client,
+                           moderator: moderator_client}
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        response = admin_client.get(url)
+        assert 'comments' not in response.json()['results'][0], (
+            'Проверьте, что комментарии добавляются к отзывам только с '
+            'параметром `expand=comments`.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.get(
+                f'{url}?expand=comments&comments_limit=2'
+            )
+        assert response.status_code == 200
+        assert len(context.captured_queries) == 4, (
+            f'Проверьте, что `{url}?expand=comments` получает комментарии '
+            'всех отзывов страницы одним запросом.'
+        )
+        results = {review['id']: review for review in
+                   response.json()['results']}
+        newest = [comment['id'] for comment in reversed(comments)][:2]
+        assert [comment['id'] for comment in
+                results[reviews[0]['id']]['comments']] == newest, (
+            'Проверьте, что `comments_limit` ограничивает количество самых '
+            'новых комментариев у каждого отзыва.'
+        )
+        assert results[reviews[1]['id']]['comments'] == []
+
+        response = admin_client.get(
+            f'{url}{reviews[0]["id"]}/?expand=comments'
+        )
+        assert len(response.json()['comments']) == 3
+        response = admin_client.get(f'{url}?expand=comments&comments_limit=x')
+        assert response.status_code == 400
@@ -0,0 +1,72 @@
+import pytest
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews.models import OutboxMessage
+
+LOCMEM_BACKEND = 'django.core.mail.backends.locmem.EmailBackend'
+
+
+class FailingEmailBackend(EmailBackend):
+    def send_messages(self, messages):
+        raise ConnectionError('SMTP недоступен')
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23Outbox:
+    url_signup = '/api/v1/auth/signup/'
+    valid_data = {'email': 'outbox@yamdb.fake', 'username': 'outbox_user'}
+
+    def test_01_signup_queues_mail(self, client):
+        response = client.post(self.url_signup, data=self.valid_data)
+        assert response.status_code == 200
+        assert len(mail.outbox) == 0, (
+            f'Проверьте, что `{self.url_signup}` не отправляет письмо сам, '
+            'а ставит его в очередь.'
+        )
+        message = OutboxMessage.objects.get()
+        assert message.recipient == self.valid_data['email']
+
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+        assert mail.outbox[0].to == [self.valid_data['email']]
+        assert mail.outbox[0].body == message.body
+        message.refresh_from_db()
+        assert message.sent is not None, (
+            'Проверьте, что команда `send_outbox` отмечает отправленные '
+            'письма.'
+        )
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
+
+    def test_02_failed_mail_is_retried(self, client, settings):
+        settings.EMAIL_BACKEND = 'tests.test_23_outbox.FailingEmailBackend'
+        client.post(self.url_signup, data=self.valid_data)
+        call_command('send_outbox')
+        message = OutboxMessage.objects.get()
+        assert message.sent is None
+        assert message.attempts == 1
+        assert message.next_attempt > timezone.now(), (
+            'Проверьте, что неотправленное письмо откладывается до '
+            'следующей попытки.'
+        )
+        assert 'SMTP' in message.last_error
+
+        settings.EMAIL_BACKEND = LOCMEM_BACKEND
+        call_command('send_outbox')
+        assert len(mail.outbox) == 0
+        OutboxMessage.objects.update(next_attempt=timezone.now())
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1, (
+            'Проверьте, что команда `send_outbox` повторяет отправку после '
+            'паузы.'
+        )
+
+        OutboxMessage.objects.update(
+            sent=None, next_attempt=timezone.now(),
+            attempts=settings.OUTBOX_MAX_ATTEMPTS
+        )
+        call_command('send_outbox')
+        assert len(mail.outbox) == 1
@@ -0,0 +1,69 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication import UserChangeStore
+from reviews.models import User
+
+
+def user_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [query['sql'] for query in context.captured_queries
+            if 'FROM "reviews_user"' in query['sql']]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24AuthCache:
+    url = '/api/v1/genres/'
+
+    def test_01_cached_token_skips_user_query(self, user_client):
+        user_client.get(self.url)
+        assert not user_queries(user_client, self.url), (
+            'Проверьте, что повторный запрос с тем же токеном не читает '
+            'пользователя из базы.'
+        )
+
+    def test_02_role_change_invalidates_cache(self, admin_client,
+                                              user_client, user):
+        data = {'name': 'Музыка', 'slug': 'music'}
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 403
+        admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'admin'}
+        )
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что смена роли пользователя сразу сбрасывает '
+            'кеш аутентификации.'
+        )
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['email'] == user.email
+
+    def test_03_change_in_another_process(self, user_client, user,
+                                          settings):
+        settings.AUTH_USER_CACHE = 'default'
+        data = {'name': 'Музыка', 'slug': 'music'}
+        assert user_client.post(
+            '/api/v1/categories/', data=data
+        ).status_code == 403
+        # Another worker changes the role: no signal runs in this process,
+        # the change is only recorded in the shared cache.
+        User.objects.filter(pk=user.pk).update(role='admin')
+        UserChangeStore(10).touch(user.pk)
+        response = user_client.post('/api/v1/categories/', data=data)
+        assert response.status_code == 201, (
+            'Проверьте, что изменение пользователя в другом процессе '
+            'сбрасывает кеш аутентификации через общий кеш.'
+        )
+
+    def test_04_change_store_is_bounded(self):
+        store = UserChangeStore(2)
+        for user_id in range(5):
+            store.touch(user_id)
+        assert len(store.local) <= 2, (
+            'Проверьте, что хранилище изменений пользователей ограничено по '
+            'размеру.'
+        )
+        assert store.changed_since(4, 0)
@@ -0,0 +1,75 @@
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25Throttling:
+    url_signup = '/api/v1/auth/signup/'
+    url_token = '/api/v1/auth/token/'
+
+    def test_01_signup_identity_throttle(self, client):
+        data = {'email': 'burst@yamdb.fake', 'username': 'burst'}
+        for _ in range(3):
+            assert client.post(self.url_signup, data=data).status_code == 200
+        with CaptureQueriesContext(connection) as context:
+            response = client.post(self.url_signup, data=data)
+        assert response.status_code == 429, (
+            f'Проверьте, что частые POST-запросы к `{self.url_signup}` с '
+            'одним `username` ограничиваются.'
+        )
+        assert 'Retry-After' in response
+        assert not context.captured_queries, (
+            'Проверьте, что ограничение запросов не обращается к базе.'
+        )
+        other = {'email': 'other@yamdb.fake', 'username': 'other'}
+        assert client.post(self.url_signup, data=other).status_code == 200
+
+    def test_01_01_non_object_body(self, client):
+        for body in ([], 'text', 5):
+            response = client.post(
+                self.url_signup, data=body, content_type='application/json'
+            )
+            assert response.status_code == 400, (
+                f'Проверьте, что POST-запрос к `{self.url_signup}` с телом, '
+                'которое не является объектом, возвращает ответ со статусом '
+                '400.'
+            )
+        response = client.post(
+            self.url_token, data=[], content_type='application/json'
+        )
+        assert response.status_code == 400
+
+    def test_02_ip_throttle(self, client, settings):
+        settings.REST_FRAMEWORK = {
+            **settings.REST_FRAMEWORK,
+            'DEFAULT_THROTTLE_RATES': {'token': '2/min'},
+        }
+        for username in ('first', 'second'):
+            response = client.post(
+                self.url_token,
+                data={'username': username, 'confirmation_code': '0'}
+            )
+            assert response.status_code == 404
+        response = client.post(
+            self.url_token,
+            data={'username': 'third', 'confirmation_code': '0'}
+        )
+        assert response.status_code == 429, (
+            f'Проверьте, что POST-запросы к `{self.url_token}` с одного '
+            'IP-адреса ограничиваются.'
+        )
+
+    def test_03_shared_backend(self, client, settings):
+        settings.THROTTLE_CACHE = 'default'
+        caches['default'].clear()
+        data = {'email': 'shared@yamdb.fake', 'username': 'shared'}
+        for _ in range(3):
+            client.post(self.url_signup, data=data)
+        assert caches['default'].get('signup_identity:username:shared'), (
+            'Проверьте, что при заданном `THROTTLE_CACHE` состояние '
+            'ограничений хранится в общем кэше.'
+        )
+        assert client.post(self.url_signup, data=data).status_code == 429
+        caches['default'].clear()
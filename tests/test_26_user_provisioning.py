@@ -0,0 +1,82 @@
+import pytest
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import OutboxMessage, User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26UserProvisioning:
+    url = '/api/v1/users/'
+
+    def test_01_bulk_create_users(self, admin_client, user_client, client):
+        data = [{'username': f'partner_{idx}',
+                 'email': f'partner_{idx}@yamdb.fake'} for idx in range(50)]
+        assert user_client.post(
+            self.url, data=data, format='json'
+        ).status_code == 403
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 201, (
+            f'Проверьте, что POST-запрос администратора к `{self.url}` со '
+            'списком пользователей возвращает ответ со статусом 201.'
+        )
+        assert len(response.json()) == 50
+        assert len(context.captured_queries) < 10, (
+            f'Проверьте, что `{self.url}` создаёт пользователей пакетно.'
+        )
+        users = User.objects.filter(username__startswith='partner_')
+        assert users.count() == 50
+        assert OutboxMessage.objects.filter(
+            recipient__startswith='partner_'
+        ).count() == 50, (
+            'Проверьте, что письма с кодами подтверждения ставятся в очередь.'
+        )
+        user = User.objects.get(username='partner_0')
+        assert not user.has_usable_password()
+        code = OutboxMessage.objects.get(
+            recipient=user.email
+        ).body.rsplit(' ', 1)[-1]
+        response = client.post('/api/v1/auth/token/', data={
+            'username': user.username, 'confirmation_code': code
+        })
+        assert response.status_code == 200, (
+            'Проверьте, что код из письма подходит для получения токена.'
+        )
+
+    def test_02_bulk_create_clashes(self, admin_client, admin):
+        data = [
+            {'username': admin.username, 'email': 'new@yamdb.fake'},
+            {'username': 'new', 'email': admin.email},
+            {'username': 'twin', 'email': 'twin@yamdb.fake'},
+            {'username': 'twin', 'email': 'twin2@yamdb.fake'},
+            {'username': 'me', 'email': 'me@yamdb.fake'},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 400
+        errors = response.json()
+        assert 'username' in errors[0]
+        assert 'email' in errors[1]
+        assert errors[2] == {}
+        assert 'username' in errors[3]
+        assert 'username' in errors[4]
+        assert not User.objects.filter(username='twin').exists(), (
+            'Проверьте, что при ошибках в данных пользователи не создаются.'
+        )
+
+    def test_03_provision_command(self, tmp_path, admin):
+        path = tmp_path / 'users.csv'
+        path.write_text(
+            'username,email,role\n'
+            'csv_user,csv_user@yamdb.fake,\n'
+            'csv_moder,csv_moder@yamdb.fake,moderator\n'
+        )
+        call_command('provision_users', str(path), batch_size=1)
+        assert User.objects.get(username='csv_user').role == 'user'
+        assert User.objects.get(username='csv_moder').role == 'moderator'
+        assert OutboxMessage.objects.count() == 2
+
+        path.write_text(f'username,email\n{admin.username},x@yamdb.fake\n')
+        with pytest.raises(CommandError):
+            call_command('provision_users', str(path))
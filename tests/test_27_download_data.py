@@ -0,0 +1,146 @@
+import csv
+from datetime import datetime
+from io import StringIO
+from pathlib import Path
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Avg
+
+from reviews.management.commands import download_data as download_data_command
+from reviews.management.commands.download_data import REVIEW_CSV
+from reviews.models import (Comment, Genre, ImportCheckpoint, Review, Title,
+                            User)
+
+DATA_DIR = Path(settings.BASE_DIR) / 'static' / 'data'
+
+
+def read_csv(name):
+    with open(DATA_DIR / name, encoding='utf-8-sig') as csv_file:
+        return list(csv.DictReader(csv_file))
+
+
+def download_data(monkeypatch, *args):
+    monkeypatch.chdir(settings.BASE_DIR)
+    out = StringIO()
+    call_command('download_data', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27DownloadData:
+
+    def test_01_loads_all_tables(self, monkeypatch):
+        out = download_data(monkeypatch, '--batch-size', '7')
+        assert Title.objects.count() == len(read_csv('titles.csv'))
+        assert Review.objects.count() == len(read_csv('review.csv'))
+        assert Comment.objects.count() == len(read_csv('comments.csv'))
+        assert User.objects.count() == len(read_csv('users.csv'))
+        assert Title.genre.through.objects.count() == len(
+            read_csv('genre_title.csv')
+        ), (
+            'Проверьте, что команда `download_data` загружает связи '
+            'произведений и жанров из `genre_title.csv`.'
+        )
+        row = read_csv('genre_title.csv')[0]
+        assert Genre.objects.get(pk=row['genre_id']) in Title.objects.get(
+            pk=row['title_id']
+        ).genre.all()
+        assert 'rows in' in out, (
+            'Проверьте, что команда `download_data` выводит время загрузки '
+            'каждой таблицы.'
+        )
+
+    def test_02_keeps_pub_date(self, monkeypatch):
+        download_data(monkeypatch)
+        row = read_csv('review.csv')[0]
+        expected = datetime.fromisoformat(row['pub_date'].replace('Z', ''))
+        pub_date = Review.objects.get(pk=row['id']).pub_date
+        assert pub_date.replace(tzinfo=None) == expected, (
+            'Проверьте, что команда `download_data` сохраняет `pub_date` '
+            'из CSV, а не подставляет текущее время.'
+        )
+
+    def test_03_refreshes_aggregates(self, monkeypatch):
+        download_data(monkeypatch)
+        title = Title.objects.filter(reviews__isnull=False).first()
+        expected = title.reviews.aggregate(avg=Avg('score'))['avg']
+        title.refresh_from_db()
+        assert title.rating == pytest.approx(expected), (
+            'Проверьте, что после загрузки `download_data` пересчитывает '
+            'рейтинги произведений.'
+        )
+
+    def test_04_skips_loaded_tables(self, monkeypatch):
+        download_data(monkeypatch)
+        out = download_data(monkeypatch)
+        assert 'already loaded' in out
+        assert Review.objects.count() == len(read_csv('review.csv'))
+
+    def test_05_stream_resumes_from_checkpoint(self, monkeypatch):
+        bulk_create = Review.objects.bulk_create
+        calls = []
+
+        def interrupted(objs, *args, **kwargs):
+            calls.append(1)
+            if len(calls) == 3:
+                raise KeyboardInterrupt
+            return bulk_create(objs, *args, **kwargs)
+
+        monkeypatch.setattr(Review.objects, 'bulk_create', interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            download_data(monkeypatch, '--stream', '--batch-size', '10')
+        assert Review.objects.count() == 20, (
+            'Проверьте, что в режиме `--stream` каждый пакет сохраняется '
+            'в своей транзакции.'
+        )
+        checkpoint = ImportCheckpoint.objects.get(file=REVIEW_CSV)
+        assert checkpoint.last_id == int(read_csv('review.csv')[19]['id']), (
+            'Проверьте, что после каждого пакета `download_data --stream` '
+            'записывает точку восстановления.'
+        )
+
+        monkeypatch.undo()
+        out = download_data(monkeypatch, '--stream', '--batch-size', '10')
+        assert 'resuming at byte' in out
+        assert 'rows/s' in out
+        rows = read_csv('review.csv')
+        assert Review.objects.count() == len(rows), (
+            'Проверьте, что `download_data --stream` продолжает загрузку '
+            'с точки восстановления.'
+        )
+        for row in rows:
+            assert Review.objects.get(pk=row['id']).text == row['text']
+        checkpoint.refresh_from_db()
+        assert checkpoint.offset == (DATA_DIR / 'review.csv').stat().st_size
+        assert Title.genre.through.objects.count() == len(
+            read_csv('genre_title.csv')
+        )
+
+    def test_06_stream_skips_imported_files(self, monkeypatch):
+        download_data(monkeypatch, '--stream')
+        out = download_data(monkeypatch, '--stream')
+        assert 'already imported' in out
+        assert Comment.objects.count() == len(read_csv('comments.csv'))
+
+    def test_07_stream_finishes_interrupted_refresh(self, monkeypatch):
+        def interrupted(*args, **kwargs):
+            raise KeyboardInterrupt
+
+        monkeypatch.setattr(download_data_command, 'refresh_title_aggregates',
+                            interrupted)
+        with pytest.raises(KeyboardInterrupt):
+            download_data(monkeypatch, '--stream')
+        assert Title.objects.filter(reviews_count__gt=0).count() == 0
+
+        monkeypatch.undo()
+        download_data(monkeypatch, '--stream')
+        assert Title.objects.filter(reviews_count__gt=0).exists(), (
+            'Проверьте, что повторный запуск `download_data --stream` '
+            'пересчитывает агрегаты, если прошлый запуск прервался после '
+            'загрузки последнего пакета.'
+        )
+        assert not ImportCheckpoint.objects.filter(refreshed=False).exists()
+        out = download_data(monkeypatch, '--stream')
+        assert 'Aggregates refreshed' not in out